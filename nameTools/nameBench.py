@@ -0,0 +1,310 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Benchmarks for the city and unit name generators
+# By: duckstab (James Conrad Shea)
+#
+# Runs each mod's generators against the stand-ins in a fresh Python process
+# and writes the timings as JSON. A previous result can be given with
+# --baseline to see what got slower.
+#
+#   python nameBench.py -o bench.json
+#   python nameBench.py -n 500 --civ CIVILIZATION_FRANCE --baseline bench.json
+###############################################################################
+
+import os
+import sys
+import time
+import optparse
+import subprocess
+
+import nameGen
+
+# length a city's name is padded to for the rename benchmark
+LONG_BASIS = 64
+# baseline ratio above which a metric is reported as a regression
+TOLERANCE = 1.2
+
+def rss():
+	"""
+	Resident memory of this process in KB, or None if /proc is missing.
+	"""
+	try:
+		f = open("/proc/self/statm")
+		try:
+			pages = int(f.read().split()[1])
+		finally:
+			f.close()
+	except (IOError, OSError, ValueError, IndexError):
+		return None
+	return pages * os.sysconf("SC_PAGE_SIZE") / 1024
+
+def percentile(values, p):
+	"""
+	The p-th percentile of sorted values, by nearest rank.
+	"""
+	if not values:
+		return 0.0
+	i = int(len(values) * p / 100.0 + 0.5) - 1
+	return values[max(0, min(i, len(values) - 1))]
+
+def latencies(times):
+	"""
+	Throughput and latency figures, in names/s and ms, for per-name times in s.
+	"""
+	times = list(times)
+	times.sort()
+	total = sum(times)
+	result = {
+		"count": len(times),
+		"seconds": total,
+		"per_second": 0.0,
+		"mean_ms": 0.0,
+		"p50_ms": percentile(times, 50) * 1000,
+		"p90_ms": percentile(times, 90) * 1000,
+		"p99_ms": percentile(times, 99) * 1000,
+		"max_ms": 0.0,
+	}
+	if times:
+		result["mean_ms"] = total * 1000 / len(times)
+		result["max_ms"] = times[-1] * 1000
+	if total > 0:
+		result["per_second"] = len(times) / total
+	return result
+
+def longBasis(trainingSet):
+	"""
+	The longest training names joined until the result is LONG_BASIS long.
+	"""
+	names = [unicode(l) for l in trainingSet]
+	names.sort(lambda a, b: cmp(len(b), len(a)))
+	basis = u""
+	for name in names:
+		if len(basis) >= LONG_BASIS:
+			break
+		basis = (basis + u" " + name).strip()
+	return basis
+
+def generateCity(module, civ):
+	return module.GENERATORS[civ].generate()
+
+def generateUnit(module, civ):
+	import CvPythonExtensions
+	player = CvPythonExtensions.getPlayerOf(civ)
+	unit = CvPythonExtensions.CyUnit(player.getID())
+	(city, iter) = player.firstCity(False)
+	generator = module.GENERATORS[civ]
+	generator.activate(civ)
+	return generator.generate(unit, city, True)
+
+GENERATE = {
+	"city": generateCity,
+	"unit": generateUnit,
+}
+
+def benchRename(module, civ, n):
+	"""
+	Times rename() of a city with a long name, taken by the given civ.
+	"""
+	import CvPythonExtensions
+	generator = module.GENERATORS[civ]
+	if not hasattr(generator, "markov_chain"):
+		return None
+	basis = longBasis(generator.markov_chain.trainingSet)
+	player = CvPythonExtensions.getPlayerOf(civ)
+	previous = CvPythonExtensions.MAX_PLAYERS - 1
+	times = []
+	for i in xrange(n):
+		# a new plot each time, so there is no earlier name to restore
+		city = CvPythonExtensions.CyCity(player.getID(), i + 1, 1, basis)
+		start = time.time()
+		module.rename(city, previous, player.getID())
+		times.append(time.time() - start)
+	result = latencies(times)
+	result["basis_length"] = len(basis)
+	return result
+
+def child(kind, civs, n, seed, cached):
+	"""
+	Benchmarks one mod in this process and returns the results.
+	"""
+	result = {"rss_start_kb": rss()}
+	nameGen.setPath(kind)
+	start = time.time()
+	module = __import__(nameGen.MODULES[kind])
+	result["import_seconds"] = time.time() - start
+	result["rss_import_kb"] = rss()
+
+	import Markov
+	if not cached:
+		# train every chain rather than restoring it from MarkovCache.dat
+		Markov.MARKOV_CACHE = Markov.MarkovCache(os.devnull)
+	if not civs:
+		civs = module.GENERATORS.keys()
+		civs.sort()
+	nameGen.start(module, civs, seed)
+
+	training = {}
+	for civ in civs:
+		start = time.time()
+		module.GENERATORS[civ]
+		training[civ] = time.time() - start
+	result["train_seconds"] = training
+	result["train_total_seconds"] = sum(training.values())
+	result["rss_trained_kb"] = rss()
+	if result["rss_trained_kb"] is not None and result["rss_import_kb"] is not None:
+		result["rss_chains_kb"] = result["rss_trained_kb"] - result["rss_import_kb"]
+
+	generate = GENERATE[kind]
+	generation = {}
+	allTimes = []
+	for civ in civs:
+		times = []
+		for i in xrange(n):
+			start = time.time()
+			generate(module, civ)
+			times.append(time.time() - start)
+		generation[civ] = latencies(times)
+		allTimes.extend(times)
+	result["generate"] = generation
+	result["generate_total"] = latencies(allTimes)
+
+	if kind == "city":
+		renaming = {}
+		for civ in civs:
+			if civ != "CIVILIZATION_BARBARIAN":
+				figures = benchRename(module, civ, n)
+				if figures is not None:
+					renaming[civ] = figures
+		result["rename"] = renaming
+
+	result["fallbacks"] = Markov.getFallbackCounts()
+	result["rss_end_kb"] = rss()
+	return result
+
+def run(kind, options):
+	"""
+	Benchmarks one mod in a child process.
+	"""
+	args = [sys.executable, os.path.abspath(__file__), "--child", kind, "-n", str(options.count)]
+	for civ in options.civs:
+		args.extend(["--civ", civ])
+	if options.seed is not None:
+		args.extend(["--seed", str(options.seed)])
+	if options.cached:
+		args.append("--cached")
+	process = subprocess.Popen(args, stdout=subprocess.PIPE)
+	output = process.communicate()[0]
+	if process.returncode != 0:
+		raise RuntimeError("%s benchmark failed with status %d" % (kind, process.returncode))
+	import json
+	return json.loads(output)
+
+# paths of the metrics compared with the baseline; for all of them larger is worse
+METRICS = (
+	("import_seconds",),
+	("train_total_seconds",),
+	("rss_trained_kb",),
+	("generate_total", "mean_ms"),
+	("generate_total", "p99_ms"),
+)
+
+def lookup(data, path):
+	for key in path:
+		if not isinstance(data, dict) or key not in data:
+			return None
+		data = data[key]
+	return data
+
+def compare(results, baseline, out):
+	"""
+	Writes a line per metric that is TOLERANCE times its baseline value or
+	worse. Returns the number of such regressions.
+	"""
+	regressions = 0
+	for kind in nameGen.MODULES.keys():
+		paths = list(METRICS)
+		if kind == "city":
+			paths.append(("rename_total", "worst_p99_ms"))
+		for path in paths:
+			old = lookup(baseline.get(kind), path)
+			new = lookup(results.get(kind), path)
+			if not old or new is None:
+				continue
+			ratio = float(new) / old
+			if ratio >= TOLERANCE:
+				out.write("%s %s: %.4g -> %.4g (x%.2f)\n" % (kind, ".".join(path), old, new, ratio))
+				regressions = regressions + 1
+	return regressions
+
+def main(argv):
+	parser = optparse.OptionParser(usage="%prog [options]")
+	parser.add_option("-k", "--kind", action="append", dest="kinds", default=[],
+		help="city or unit; may be repeated [default: both]")
+	parser.add_option("-c", "--civ", action="append", dest="civs", default=[],
+		help="civilization type; may be repeated [default: all]")
+	parser.add_option("-n", type="int", dest="count", default=200,
+		help="names generated per civ [default: %default]")
+	parser.add_option("-s", "--seed", type="int", default=1,
+		help="random seed [default: %default]")
+	parser.add_option("--cached", action="store_true", default=False,
+		help="restore chains from MarkovCache.dat instead of training them")
+	parser.add_option("-o", "--output", default=None,
+		help="file to write [default: stdout]")
+	parser.add_option("-b", "--baseline", default=None,
+		help="earlier results to compare with")
+	parser.add_option("--child", default=None, help=optparse.SUPPRESS_HELP)
+	(options, args) = parser.parse_args(argv)
+	if args:
+		parser.error("unexpected arguments: %s" % " ".join(args))
+
+	import json
+	if options.child:
+		result = child(options.child, options.civs, options.count, options.seed, options.cached)
+		sys.stdout.write(json.dumps(result))
+		return 0
+
+	kinds = options.kinds or ["city", "unit"]
+	for kind in kinds:
+		if kind not in nameGen.MODULES:
+			parser.error("unknown kind: %s" % kind)
+	results = {
+		"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+		"python": sys.version.split()[0],
+		"platform": sys.platform,
+		"count": options.count,
+		"seed": options.seed,
+		"cached": options.cached,
+	}
+	for kind in kinds:
+		results[kind] = run(kind, options)
+		if "rename" in results[kind]:
+			times = [figures["mean_ms"] for figures in results[kind]["rename"].values()]
+			results[kind]["rename_total"] = {
+				"mean_ms": sum(times) / max(len(times), 1),
+				"worst_p99_ms": max([figures["p99_ms"] for figures in results[kind]["rename"].values()] or [0.0]),
+			}
+
+	text = json.dumps(results, indent=1, sort_keys=True)
+	if options.output:
+		f = open(options.output, "w")
+		try:
+			f.write(text)
+			f.write("\n")
+		finally:
+			f.close()
+	else:
+		sys.stdout.write(text + "\n")
+
+	if options.baseline:
+		f = open(options.baseline)
+		try:
+			baseline = json.load(f)
+		finally:
+			f.close()
+		if compare(results, baseline, sys.stderr):
+			return 1
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
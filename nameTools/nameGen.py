@@ -0,0 +1,194 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Generates city or unit names outside the game
+# By: duckstab (James Conrad Shea)
+#
+# Runs RandomCityNames.py and RandomNameUtils.py against the stand-ins in
+# standins/, with every random number drawn from a seeded Python generator,
+# and writes N names per civ as CSV or JSON.
+#
+#   python nameGen.py --kind city -n 20 --civ CIVILIZATION_FRANCE
+#   python nameGen.py --kind unit -n 100 --seed 7 --format json -o units.json
+#   python nameGen.py --kind city --build-cache
+###############################################################################
+
+import os
+import sys
+import optparse
+
+HOME = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HOME)
+CONTRIB = {
+	"city": os.path.join(ROOT, "randomCityNames", "Assets", "Python", "Contrib"),
+	"unit": os.path.join(ROOT, "unitNamingPlus", "Assets", "Python", "Contrib"),
+}
+MODULES = {
+	"city": "RandomCityNames",
+	"unit": "RandomNameUtils",
+}
+
+def setPath(kind):
+	"""
+	Puts the stand-ins, then the mod's Contrib directory, on the path.
+	"""
+	sys.path.insert(0, CONTRIB[kind])
+	sys.path.insert(0, os.path.join(HOME, "standins"))
+
+def load(kind, profile=False):
+	setPath(kind)
+	if profile:
+		import StartupProfile
+		StartupProfile.enable()
+		StartupProfile.install()
+	return __import__(MODULES[kind])
+
+def start(module, civs, seed):
+	"""
+	Starts a stand-in game between the given civs, each with one city, and
+	switches the shared random source to a seeded backend.
+	"""
+	import CvPythonExtensions
+	import BugData
+	import RandomSource
+	CvPythonExtensions.setup(civs, seed)
+	BugData.reset()
+	RandomSource.seed(seed)
+	for civ in civs:
+		player = CvPythonExtensions.getPlayerOf(civ)
+		if player is not None:
+			player.addCity(player.getID(), 0, "Capital")
+	if hasattr(module, "load"):
+		module.load()
+
+def cityNames(module, civ, n):
+	return module.GENERATORS[civ].generate_many(n)
+
+def unitNames(module, civ, n, masculine):
+	import CvPythonExtensions
+	player = CvPythonExtensions.getPlayerOf(civ)
+	if player is None:
+		return []
+	unit = CvPythonExtensions.CyUnit(player.getID())
+	(city, iter) = player.firstCity(False)
+	generator = module.GENERATORS[civ]
+	generator.activate(civ)
+	names = []
+	for i in xrange(n):
+		names.append(generator.generate(unit, city, masculine))
+	return names
+
+def generate(kind, civs, n, seed=None, masculine=True, profile=False):
+	"""
+	Returns a list of (civ, names) pairs, in the order of civs.
+	"""
+	module = load(kind, profile)
+	if not civs:
+		civs = module.GENERATORS.keys()
+		civs.sort()
+	for civ in civs:
+		if civ not in module.GENERATORS:
+			raise ValueError("no %s name generator for %s" % (kind, civ))
+	start(module, civs, seed)
+	result = []
+	for civ in civs:
+		if kind == "city":
+			names = cityNames(module, civ, n)
+		else:
+			names = unitNames(module, civ, n, masculine)
+		result.append((civ, names))
+	return result
+
+def buildCache(kind):
+	"""
+	Trains every chain of the mod and rewrites its MarkovCache.dat with
+	them. Returns the number of chains written.
+	"""
+	setPath(kind)
+	import Markov
+	Markov.MARKOV_CACHE.clear()
+	module = __import__(MODULES[kind])
+	civs = module.GENERATORS.keys()
+	civs.sort()
+	start(module, civs, None)
+	module.GENERATORS.warm(civs)
+	Markov.MARKOV_CACHE.save(False)
+	return len(Markov.MARKOV_CACHE.chains)
+
+def toUnicode(name):
+	if isinstance(name, unicode):
+		return name
+	return name.decode("utf-8")
+
+def writeCsv(out, kind, result):
+	out.write("kind,civ,index,name\n")
+	for (civ, names) in result:
+		for i in range(len(names)):
+			name = toUnicode(names[i]).replace(u'"', u'""')
+			out.write(('%s,%s,%d,"%s"\n' % (kind, civ, i, name)).encode("utf-8"))
+
+def writeJson(out, kind, result):
+	import json
+	data = {}
+	for (civ, names) in result:
+		data[civ] = [toUnicode(name) for name in names]
+	out.write(json.dumps(data, indent=1, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+	out.write("\n")
+
+WRITERS = {
+	"csv": writeCsv,
+	"json": writeJson,
+}
+
+def main(argv):
+	parser = optparse.OptionParser(usage="%prog [options]")
+	parser.add_option("-k", "--kind", choices=("city", "unit"), default="city",
+		help="city or unit names [default: %default]")
+	parser.add_option("-c", "--civ", action="append", dest="civs", default=[],
+		help="civilization type, e.g. CIVILIZATION_FRANCE; may be repeated [default: all]")
+	parser.add_option("-n", type="int", dest="count", default=10,
+		help="names per civ [default: %default]")
+	parser.add_option("-s", "--seed", type="int", default=None,
+		help="random seed [default: none]")
+	parser.add_option("-f", "--format", choices=WRITERS.keys(), default="csv",
+		help="csv or json [default: %default]")
+	parser.add_option("-o", "--output", default=None,
+		help="file to write [default: stdout]")
+	parser.add_option("--feminine", action="store_true", default=False,
+		help="feminine unit names")
+	parser.add_option("--profile", action="store_true", default=False,
+		help="write the time taken by each import and generator to stderr")
+	parser.add_option("--build-cache", action="store_true", default=False,
+		help="train every chain of the mod and write its MarkovCache.dat")
+	(options, args) = parser.parse_args(argv)
+	if args:
+		parser.error("unexpected arguments: %s" % " ".join(args))
+
+	if options.build_cache:
+		count = buildCache(options.kind)
+		import Markov
+		sys.stderr.write("%d chains written to %s\n" % (count, Markov.CACHE_FILE))
+		return 0
+
+	try:
+		result = generate(options.kind, options.civs, options.count, options.seed,
+			not options.feminine, options.profile)
+	except ValueError, e:
+		parser.error(str(e))
+	if options.profile:
+		import StartupProfile
+		StartupProfile.report(lambda line: sys.stderr.write(line + "\n"))
+
+	if options.output:
+		out = open(options.output, "wb")
+	else:
+		out = sys.stdout
+	try:
+		WRITERS[options.format](out, options.kind, result)
+	finally:
+		if options.output:
+			out.close()
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
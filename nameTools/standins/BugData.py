@@ -0,0 +1,62 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# In-memory stand-in for BUG's BugData, for running the name generators
+# outside Civ 4
+# By: duckstab (James Conrad Shea)
+###############################################################################
+
+class Table:
+	"""
+	A table of values and nested tables, kept in memory.
+	"""
+
+	def __init__(self):
+		self.data = {}
+
+	def hasTable(self, key):
+		return isinstance(self.data.get(key), Table)
+
+	def getTable(self, key):
+		table = self.data.get(key)
+		if not isinstance(table, Table):
+			table = Table()
+			self.data[key] = table
+		return table
+
+	def delTable(self, key):
+		if self.hasTable(key):
+			del self.data[key]
+
+	def keys(self):
+		return self.data.keys()
+
+	def __contains__(self, key):
+		return key in self.data
+
+	def __getitem__(self, key):
+		return self.data.get(key)
+
+	def __setitem__(self, key, value):
+		self.data[key] = value
+
+	def __delitem__(self, key):
+		del self.data[key]
+
+GAME_DATA = Table()
+SAVES = 0
+
+def getGameData():
+	return GAME_DATA
+
+def save():
+	global SAVES
+	SAVES = SAVES + 1
+
+def reset():
+	"""
+	Forgets all data, as for a new game.
+	"""
+	global GAME_DATA, SAVES
+	GAME_DATA = Table()
+	SAVES = 0
@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# No-op stand-in for BUG's BugUtil, for running the name generators
+# outside Civ 4
+# By: duckstab (James Conrad Shea)
+###############################################################################
+
+import sys
+
+DEBUG = 0
+INFO = 1
+WARN = 2
+ERROR = 3
+
+# messages below this level are dropped; set it to DEBUG to see them all
+minimumLogLevel = ERROR + 1
+
+def shouldLog(level):
+	return level >= minimumLogLevel
+
+def log(level, message, *args):
+	"""
+	Writes message % args to standard error, which is kept for the names.
+	"""
+	if shouldLog(level):
+		if args:
+			message = message % args
+		sys.stderr.write("%s\n" % message)
+
+def debug(message, *args):
+	log(DEBUG, message, *args)
+
+def info(message, *args):
+	log(INFO, message, *args)
+
+def warn(message, *args):
+	log(WARN, message, *args)
+
+def error(message, *args):
+	log(ERROR, message, *args)
+
+def alert(message, *args):
+	log(INFO, message, *args)
+
+def getPlainText(key, default=None):
+	if default is None:
+		return key
+	return default
+
+def getText(key, args=(), default=None):
+	return getPlainText(key, default)
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Stand-in for the game's CvPythonExtensions, for running the name
+# generators outside Civ 4
+# By: duckstab (James Conrad Shea)
+#
+# Only the calls made by Markov.py, RandomSource.py, RandomCityNames.py and
+# RandomNameUtils.py are provided. The "game" is a list of civilizations,
+# one player each, set up with setup().
+###############################################################################
+
+import random
+
+class CyRandom:
+	"""
+	ASyncRand with a seed.
+	"""
+
+	def __init__(self, seed=None):
+		self.rng = random.Random(seed)
+		self.calls = 0
+
+	def seed(self, seed):
+		self.rng.seed(seed)
+
+	def get(self, n, reason=None):
+		self.calls = self.calls + 1
+		if n <= 1:
+			return 0
+		return self.rng.randrange(n)
+
+class CvInfo:
+	def __init__(self, type):
+		self.type = type
+
+	def getType(self):
+		return self.type
+
+	def getDescription(self):
+		return self.type
+
+class CyCity:
+	def __init__(self, owner, x, y, name):
+		self.owner = owner
+		self.x = x
+		self.y = y
+		self.name = name
+
+	def getOwner(self):
+		return self.owner
+
+	def getCivilizationType(self):
+		return PLAYERS[self.owner].getCivilizationType()
+
+	def getX(self):
+		return self.x
+
+	def getY(self):
+		return self.y
+
+	def getName(self):
+		return self.name
+
+	def setName(self, name, bFound):
+		self.name = name
+
+	def isNone(self):
+		return False
+
+class CyUnit:
+	def __init__(self, owner, unitClass=0):
+		self.owner = owner
+		self.unitClass = unitClass
+
+	def getOwner(self):
+		return self.owner
+
+	def getUnitClassType(self):
+		return self.unitClass
+
+	def isNone(self):
+		return False
+
+class CyPlayer:
+	def __init__(self, id, civ):
+		self.id = id
+		self.civ = civ
+		self.cities = []
+
+	def getID(self):
+		return self.id
+
+	def getCivilizationType(self):
+		return self.civ
+
+	def isAlive(self):
+		return self.civ >= 0
+
+	def isEverAlive(self):
+		return self.civ >= 0
+
+	def isBarbarian(self):
+		return self.civ >= 0 and CIVILIZATIONS[self.civ].getType() == "CIVILIZATION_BARBARIAN"
+
+	def getNumCities(self):
+		return len(self.cities)
+
+	def firstCity(self, bRev):
+		return self.nextCity(0, bRev)
+
+	def nextCity(self, iter, bRev):
+		if iter < len(self.cities):
+			return (self.cities[iter], iter + 1)
+		return (None, iter)
+
+	def addCity(self, x, y, name):
+		city = CyCity(self.id, x, y, name)
+		self.cities.append(city)
+		return city
+
+class CyGame:
+	def countCivPlayersEverAlive(self):
+		count = 0
+		for player in PLAYERS:
+			if player.isEverAlive() and not player.isBarbarian():
+				count = count + 1
+		return count
+
+	def getActivePlayer(self):
+		return 0
+
+	def getGameTurn(self):
+		return 0
+
+	def isNetworkMultiPlayer(self):
+		return False
+
+MAX_CIV_PLAYERS = 18
+MAX_PLAYERS = MAX_CIV_PLAYERS + 1
+
+ASYNC_RAND = CyRandom()
+GAME = CyGame()
+CIVILIZATIONS = []
+PLAYERS = [CyPlayer(i, -1) for i in range(MAX_PLAYERS)]
+UNIT_CLASSES = [CvInfo("UNITCLASS_WARRIOR"), CvInfo("UNITCLASS_SPY")]
+
+class CyGlobalContext:
+	def getASyncRand(self):
+		return ASYNC_RAND
+
+	def getGame(self):
+		return GAME
+
+	def getMAX_CIV_PLAYERS(self):
+		return MAX_CIV_PLAYERS
+
+	def getMAX_PLAYERS(self):
+		return MAX_PLAYERS
+
+	def getPlayer(self, iPlayer):
+		return PLAYERS[iPlayer]
+
+	def getNumCivilizationInfos(self):
+		return len(CIVILIZATIONS)
+
+	def getCivilizationInfo(self, iCivilization):
+		if iCivilization < 0 or iCivilization >= len(CIVILIZATIONS):
+			return None
+		return CIVILIZATIONS[iCivilization]
+
+	def getUnitClassInfo(self, iUnitClass):
+		return UNIT_CLASSES[iUnitClass]
+
+def setup(civs, seed=None):
+	"""
+	Starts a game between the given civilization types. The civs, except
+	the barbarians, get the first players; the barbarians get the last.
+	There are more players than in the game if there are more than 18 civs.
+	"""
+	global CIVILIZATIONS, PLAYERS, MAX_CIV_PLAYERS, MAX_PLAYERS
+	MAX_CIV_PLAYERS = max(18, len(civs))
+	MAX_PLAYERS = MAX_CIV_PLAYERS + 1
+	CIVILIZATIONS = [CvInfo(civ) for civ in civs]
+	PLAYERS = [CyPlayer(i, -1) for i in range(MAX_PLAYERS)]
+	iPlayer = 0
+	for i in range(len(civs)):
+		if civs[i] == "CIVILIZATION_BARBARIAN":
+			PLAYERS[MAX_PLAYERS - 1] = CyPlayer(MAX_PLAYERS - 1, i)
+		else:
+			PLAYERS[iPlayer] = CyPlayer(iPlayer, i)
+			iPlayer = iPlayer + 1
+	ASYNC_RAND.seed(seed)
+	ASYNC_RAND.calls = 0
+
+def getCivilizationIndex(civ):
+	for i in range(len(CIVILIZATIONS)):
+		if CIVILIZATIONS[i].getType() == civ:
+			return i
+	return -1
+
+def getPlayerOf(civ):
+	"""
+	The player playing the given civilization type, or None.
+	"""
+	i = getCivilizationIndex(civ)
+	for player in PLAYERS:
+		if player.civ == i and i >= 0:
+			return player
+	return None
@@ -0,0 +1,14 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Stand-in for the game's CvUtil, for running the name generators outside
+# Civ 4
+# By: duckstab (James Conrad Shea)
+###############################################################################
+
+def pyPrint(message):
+	pass
+
+def pyAssert(condition, message):
+	if not condition:
+		raise AssertionError(message)
@@ -9,31 +9,338 @@
 ###############################################################################
 
 from CvPythonExtensions import *
+from array import array
+from bisect import bisect_right
+import marshal
+import os
+import sys
+import time
+import RandomSource
+
+try:
+	from hashlib import md5
+except ImportError:
+	from md5 import new as md5
 
 gc = CyGlobalContext()
 
+# character id reserved for the end of a name
+END = 0
+# bits per character id when a prefix is packed into a state key
+CHAR_BITS = 16
+# compiled tables are only reused by a build with the same layout
+CACHE_FORMAT = (1, CHAR_BITS, array('l').itemsize, array('H').itemsize, sys.byteorder)
+try:
+	CACHE_FILE = os.path.join(os.path.dirname(__file__), "MarkovCache.dat")
+except NameError:
+	CACHE_FILE = "MarkovCache.dat"
+# attempts and seconds allowed for one name before falling back
+GENERATION_STEPS = 64
+GENERATION_TIME = 0.05
+
+class Budget:
+	"""
+	Attempts and time left for generating one name.
+	"""
+
+	def __init__(self, steps=GENERATION_STEPS, seconds=GENERATION_TIME):
+		self.steps = steps
+		self.deadline = time.clock() + seconds
+
+	def spend(self):
+		"""
+		Uses up one attempt; False once the attempts or the time have run out.
+		"""
+		self.steps = self.steps - 1
+		return self.steps >= 0 and time.clock() <= self.deadline
+
+# number of times each generator had to fall back, by label
+FALLBACKS = {}
+
+def countFallback(label):
+	FALLBACKS[label] = FALLBACKS.get(label, 0) + 1
+
+def getFallbackCounts():
+	return FALLBACKS.copy()
+
 class MarkovDict:
-	def __init__(self):
-		self.random = gc.getASyncRand()
-		self.d = {}
+	"""
+	Compiled transition table.
 
-	def __getitem__(self, key):
-		if key in self.d:
-			return self.d[key]
-		else:
-			raise KeyError(key)
+	Characters are interned to small integer ids and every prefix is packed
+	into an integer key which maps to a state id. While training, suffix
+	counts are collected per state; compile() then flattens them so that the
+	distinct suffixes of state s are suffixes[offsets[s]:offsets[s + 1]],
+	with the running total of their counts in the same slice of weights
+	and the state each suffix leads to (-1 for END) in targets. masks holds
+	the same suffixes of each state as a bit set of character ids.
+	"""
+
+	def __init__(self, chainlen=2):
+		self.random = RandomSource.RANDOM
+		self.chainlen = chainlen
+		self.mask = (1 << (CHAR_BITS * chainlen)) - 1
+		self.chars = [u"\n"]
+		self.ids = {u"\n": END}
+		self.states = {}
+		self.pending = []
+		self.offsets = array('l', [0])
+		self.suffixes = array('H')
+		self.weights = array('l')
+		self.targets = array('l')
+		self.masks = []
+
+	def intern(self, c):
+		cid = self.ids.get(c)
+		if cid is None:
+			cid = len(self.chars)
+			self.chars.append(c)
+			self.ids[c] = cid
+		return cid
+
+	def pack(self, prefix):
+		key = 0
+		for c in prefix:
+			if c not in self.ids:
+				raise KeyError(prefix)
+			key = (key << CHAR_BITS) | self.ids[c]
+		return key
+
+	def shift(self, key, cid):
+		return ((key << CHAR_BITS) | cid) & self.mask
+
+	def add(self, key, cid):
+		state = self.states.get(key)
+		if state is None:
+			state = len(self.pending)
+			self.states[key] = state
+			self.pending.append({})
+		counts = self.pending[state]
+		counts[cid] = counts.get(cid, 0) + 1
 
 	def add_key(self, prefix, suffix):
-		key = tuple([c for c in prefix])
-		if key in self.d:
-			self.d[key].append(suffix)
+		key = 0
+		for c in prefix:
+			key = (key << CHAR_BITS) | self.intern(c)
+		self.add(key, self.intern(suffix))
+
+	def compile(self):
+		offsets = array('l', [0])
+		suffixes = array('H')
+		weights = array('l')
+		for counts in self.pending:
+			total = 0
+			cids = counts.keys()
+			cids.sort()
+			for cid in cids:
+				total = total + counts[cid]
+				suffixes.append(cid)
+				weights.append(total)
+			offsets.append(len(suffixes))
+		self.offsets = offsets
+		self.suffixes = suffixes
+		self.weights = weights
+		self.pending = []
+		self.link()
+
+	def link(self):
+		targets = array('l', [-1] * len(self.suffixes))
+		masks = [0] * len(self.states)
+		for key, state in self.states.items():
+			mask = 0
+			for e in xrange(self.offsets[state], self.offsets[state + 1]):
+				cid = self.suffixes[e]
+				mask = mask | (1 << cid)
+				if cid != END:
+					targets[e] = self.states[self.shift(key, cid)]
+			masks[state] = mask
+		self.targets = targets
+		self.masks = masks
+
+	def dump(self):
+		keys = [0] * len(self.states)
+		for key, state in self.states.items():
+			keys[state] = key
+		return (self.chars, keys, self.offsets.tostring(), self.suffixes.tostring(), self.weights.tostring())
+
+	def restore(self, tables):
+		(chars, keys, offsets, suffixes, weights) = tables
+		self.chars = list(chars)
+		self.ids = {}
+		for cid in range(len(self.chars)):
+			self.ids[self.chars[cid]] = cid
+		self.states = {}
+		for state in range(len(keys)):
+			self.states[keys[state]] = state
+		self.offsets = array('l')
+		self.offsets.fromstring(offsets)
+		self.suffixes = array('H')
+		self.suffixes.fromstring(suffixes)
+		self.weights = array('l')
+		self.weights.fromstring(weights)
+		self.pending = []
+		self.link()
+
+class MarkovCache:
+	"""
+	Compiled MarkovDict tables keyed by a digest of their training set.
+
+	The file is meant to be prebuilt with every chain (nameGen.py
+	--build-cache), but any chain missing from it is trained and added at
+	runtime. The file is read the first time a chain is looked up. A chain
+	whose training set is found is restored and its entry dropped; the
+	entries left are released by save() and read again only if another
+	chain is looked up later. save() merges newly trained chains into the
+	entries already in the file.
+	"""
+
+	def __init__(self, path):
+		self.path = path
+		self.tables = None
+		self.chains = {}
+		self.trained = {}
+
+	def read(self):
+		"""
+		The tables in the file, or {} if it is missing or from another build.
+		"""
+		try:
+			f = open(self.path, "rb")
+			try:
+				data = marshal.loads(f.read())
+			finally:
+				f.close()
+		except (IOError, OSError, EOFError, ValueError, TypeError):
+			return {}
+		if type(data) is dict and data.get("format") == CACHE_FORMAT:
+			return data["tables"]
+		return {}
+
+	def load(self):
+		self.tables = self.read()
+
+	def clear(self):
+		"""
+		Ignores the entries in the file, so that every chain is trained.
+		"""
+		self.tables = {}
+
+	def save(self, merge=True):
+		"""
+		Writes the chains trained since the last save into the file. Unless
+		merge, the file is rewritten with only the chains built in this
+		session, dropping entries for old training sets.
+		"""
+		if merge and not self.trained:
+			self.tables = None
+			return
+		if merge:
+			tables = self.read()
+			chains = self.trained
 		else:
-			self.d[key] = [suffix]
+			tables = {}
+			chains = self.chains
+		for digest, mcd in chains.items():
+			tables[digest] = mcd.dump()
+		data = {"format": CACHE_FORMAT, "tables": tables}
+		try:
+			f = open(self.path, "wb")
+			try:
+				f.write(marshal.dumps(data, 1))
+			finally:
+				f.close()
+			self.trained = {}
+		except (IOError, OSError):
+			pass
+		self.tables = None
+
+	def get(self, digest):
+		mcd = self.chains.get(digest)
+		if mcd is not None:
+			return mcd.dump()
+		if self.tables is None:
+			self.load()
+		return self.tables.pop(digest, None)
 
-	def get_suffix(self, prefix):
-		key = tuple([c for c in prefix])
-		l = self[key]
-		return l[self.random.get(len(l), "MarkovDict.choice")]
+	def keep(self, digest, mcd):
+		"""
+		Records a chain restored from the cache.
+		"""
+		self.chains[digest] = mcd
+
+	def put(self, digest, mcd):
+		"""
+		Records a newly trained chain, to be written by save().
+		"""
+		self.chains[digest] = mcd
+		self.trained[digest] = mcd
+
+def training_digest(trainingSet, chainlen):
+	h = md5()
+	h.update(str(chainlen))
+	for l in trainingSet:
+		h.update("\n")
+		h.update(unicode(l).encode("utf-8"))
+	return h.hexdigest()
+
+MARKOV_CACHE = MarkovCache(CACHE_FILE)
+
+class Basis:
+	"""
+	An old name used to steer a new one, as when a conquered city is renamed.
+
+	Each step takes the earliest character left in the old name that the
+	current state allows, and consumes the old name up to and including it.
+	present[i] is the bit set of character ids found in the old name from
+	position i on, so a step that matches nothing costs one mask test, and
+	a step that does match only scans characters it then consumes. The
+	index itself is never changed, so it can be reused for many names.
+	"""
+
+	def __init__(self, ids, oldname):
+		length = len(oldname)
+		cids = [None] * length
+		present = [0] * (length + 1)
+		mask = 0
+		for i in xrange(length - 1, -1, -1):
+			cid = ids.get(oldname[i])
+			if cid is not None:
+				mask = mask | (1 << cid)
+			cids[i] = cid
+			present[i] = mask
+		self.oldname = oldname
+		self.cids = cids
+		self.present = present
+
+	def find(self, pos, allowed):
+		"""
+		(cid, pos) for the earliest character at or after pos in the allowed
+		bit set and the position following it, or (None, pos).
+		"""
+		if not self.present[pos] & allowed:
+			return (None, pos)
+		cids = self.cids
+		while True:
+			cid = cids[pos]
+			pos = pos + 1
+			if cid is not None and (allowed >> cid) & 1:
+				return (cid, pos)
+
+def doubled(cids, cid):
+	"""
+	True when appending cid to the character ids in cids gives a name made
+	of two identical halves.
+	"""
+	length = len(cids) + 1
+	if length % 2:
+		return False
+	half = length / 2
+	if cids[half - 1] != cid:
+		return False
+	for i in xrange(half - 1):
+		if cids[i] != cids[half + i]:
+			return False
+	return True
 
 class MarkovChain:
 	"""
@@ -45,51 +352,263 @@ class MarkovChain:
 		Building the dictionary
 		"""
 
-		self.mcd = MarkovDict()
-		#oldnames = []
+		self.mcd = MarkovDict(chainlen)
 		self.maxlen = maxlen
 		self.chainlen = chainlen
+		self.trainingSet = trainingSet
+
+		digest = training_digest(trainingSet, chainlen)
+		tables = MARKOV_CACHE.get(digest)
+		if tables is None:
+			self.train(trainingSet)
+			MARKOV_CACHE.put(digest, self.mcd)
+		else:
+			self.mcd.restore(tables)
+			MARKOV_CACHE.keep(digest, self.mcd)
+		self.start = self.mcd.pack(unicode("_" * chainlen))
+		self.ends = None
+		self.basis = None
+
+	def train(self, trainingSet):
+		mcd = self.mcd
+		start = 0
+		for c in unicode("_" * self.chainlen):
+			start = (start << CHAR_BITS) | mcd.intern(c)
 
 		for l in trainingSet:
-			#oldnames.append(l)
-			s = unicode("_" * chainlen) + l
-			for n in range(0, len(l)):
-				self.mcd.add_key(s[n:n + chainlen], s[n + chainlen])
-			self.mcd.add_key(s[len(l):len(l) + chainlen], "\n")
+			key = start
+			for c in l:
+				cid = mcd.intern(c)
+				mcd.add(key, cid)
+				key = mcd.shift(key, cid)
+			mcd.add(key, END)
+		mcd.compile()
 
 	def newName(self, oldname=""):
 		"""
 		New name from the Markov chain
 		"""
-		prefix = unicode("_" * self.chainlen)
-		name = u""
-		basis = oldname
-		for i in xrange(2 * self.maxlen):
-			suffix = None
-			if len(basis) > 0:
-				key = tuple([c for c in prefix])
-				if key in self.mcd.d:
-					choices = self.mcd.d[key]
-					for i in range(0, len(basis)):
-						if basis[i] in choices:
-							suffix = basis[i]
-							basis = basis[i+1:]
-							break
-			if suffix is None:
-				suffix = self.mcd.get_suffix(prefix)
-			if suffix == "\n" or len(name) > self.maxlen:
-				break
-			else:
-				name = self.dedup(name + suffix)
-				prefix = prefix[1:] + suffix
-		return name
-
-	def dedup(self, s):
-		l = len(s)
-		if l % 2 == 0:
-			l2 = l/2
-			if s[0:l2] == s[l2:]:
-				return s[l2:]
-		return s
+		return self.newNames(1, oldname)[0]
+
+	def newNames(self, n, basis=None):
+		"""
+		n new names from the Markov chain, steered by the old name basis
+
+		Each name is built as a list of character ids, reusing one list for
+		the whole batch, and joined once at the end. A name that becomes two
+		identical halves is cut back to one. The random numbers for the
+		batch are reserved from one block.
+		"""
+		mcd = self.mcd
+		states = mcd.states
+		masks = mcd.masks
+		offsets = mcd.offsets
+		suffixes = mcd.suffixes
+		weights = mcd.weights
+		mcd.random.reserve(n * (self.maxlen + 1))
+		get = mcd.random.get
+		mask = mcd.mask
+		maxlen = self.maxlen
+		basis = self.getBasis(basis)
+		cids = []
+		names = []
+		for j in xrange(n):
+			key = self.start
+			del cids[:]
+			pos = 0
+			for i in xrange(2 * maxlen):
+				state = states[key]
+				cid = None
+				if basis is not None:
+					(cid, pos) = basis.find(pos, masks[state])
+				if cid is None:
+					lo = offsets[state]
+					hi = offsets[state + 1]
+					r = get(weights[hi - 1], "MarkovDict.choice")
+					cid = suffixes[bisect_right(weights, r, lo, hi)]
+				if cid == END or len(cids) > maxlen:
+					break
+				if doubled(cids, cid):
+					del cids[:(len(cids) + 1) / 2]
+				cids.append(cid)
+				key = ((key << CHAR_BITS) | cid) & mask
+			names.append(self.spell(cids))
+		return names
+
+	def newNameWithin(self, minlen, maxlen, oldname="", budget=None, label="MarkovChain"):
+		"""
+		New name whose length is within [minlen, maxlen].
 
+		Tries newNameInRange, then newName while the budget lasts, and
+		finally falls back to a name from the training set, counting the
+		fallback under label.
+		"""
+		name = self.newNameInRange(minlen, maxlen, oldname)
+		if name is not None:
+			return name
+		return self.retryWithin(minlen, maxlen, oldname, budget, label)
+
+	def newNamesWithin(self, n, minlen, maxlen, oldname="", label="MarkovChain"):
+		"""
+		n new names whose lengths are within [minlen, maxlen], each found as
+		by newNameWithin.
+		"""
+		names = self.newNamesInRange(n, minlen, maxlen, oldname)
+		for i in xrange(n):
+			if names[i] is None:
+				names[i] = self.retryWithin(minlen, maxlen, oldname, None, label)
+		return names
+
+	def retryWithin(self, minlen, maxlen, oldname, budget, label):
+		if budget is None:
+			budget = Budget()
+		while budget.spend():
+			name = self.newName(oldname)
+			if len(name) >= minlen and len(name) <= maxlen:
+				return name
+		countFallback(label)
+		return self.sample()
+
+	def sample(self):
+		"""
+		A name from the training set.
+		"""
+		if not self.trainingSet:
+			return u""
+		return unicode(self.trainingSet[self.mcd.random.get(len(self.trainingSet), "MarkovChain.sample")])
+
+	def getBasis(self, oldname):
+		"""
+		The Basis index of oldname, or None if it is empty. The last one
+		built is kept, since a rename usually generates several candidates
+		from the same old name.
+		"""
+		if not oldname:
+			return None
+		basis = self.basis
+		if basis is None or basis.oldname != oldname:
+			basis = Basis(self.mcd.ids, oldname)
+			self.basis = basis
+		return basis
+
+	def endings(self):
+		"""
+		For every state, a bit mask with bit j set when the chain can reach
+		the end of a name after exactly j more characters (j <= maxlen).
+		"""
+		if self.ends is None:
+			mcd = self.mcd
+			offsets = mcd.offsets
+			suffixes = mcd.suffixes
+			targets = mcd.targets
+			full = (1 << (self.maxlen + 1)) - 1
+			count = len(offsets) - 1
+			ends = [0] * count
+			for n in xrange(self.maxlen + 1):
+				for state in xrange(count):
+					mask = 0
+					for e in xrange(offsets[state], offsets[state + 1]):
+						if suffixes[e] == END:
+							mask = mask | 1
+						else:
+							mask = mask | (ends[targets[e]] << 1)
+					ends[state] = mask & full
+			self.ends = ends
+		return self.ends
+
+	def newNameInRange(self, minlen, maxlen, oldname=""):
+		"""
+		New name from the Markov chain whose length is within [minlen, maxlen],
+		or None when the chain cannot produce a name of that length.
+		"""
+		return self.newNamesInRange(1, minlen, maxlen, oldname)[0]
+
+	def newNamesInRange(self, n, minlen, maxlen, oldname=""):
+		"""
+		n new names from the Markov chain whose lengths are within
+		[minlen, maxlen].
+
+		Suffixes are only drawn from those that still lead to the end of a
+		name within the range, weighted as usual, so a single pass is
+		enough. Suffixes that would make the name repeat itself are skipped
+		rather than collapsed. The lists a name is built in are reused for
+		the whole batch, and its random numbers reserved from one block.
+		Every name is None when the chain cannot produce a name of that
+		length.
+		"""
+		maxlen = min(maxlen, self.maxlen)
+		ends = self.endings()
+		mcd = self.mcd
+		offsets = mcd.offsets
+		suffixes = mcd.suffixes
+		weights = mcd.weights
+		targets = mcd.targets
+		start = mcd.states.get(self.start)
+		if start is None or minlen > maxlen:
+			return [None] * n
+		if not ends[start] & ((1 << (maxlen + 1)) - (1 << max(minlen, 0))):
+			return [None] * n
+		mcd.random.reserve(n * (maxlen + 1))
+		get = mcd.random.get
+		basis = self.getBasis(oldname)
+		name = []
+		candidates = []
+		names = []
+		for j in xrange(n):
+			state = start
+			del name[:]
+			pos = 0
+			while True:
+				length = len(name)
+				lo = offsets[state]
+				hi = offsets[state + 1]
+				# remaining characters allowed after the next one
+				low = max(minlen - length - 1, 0)
+				high = maxlen - length - 1
+				if high >= low:
+					window = (1 << (high + 1)) - (1 << low)
+				else:
+					window = 0
+				del candidates[:]
+				allowed = 0
+				total = 0
+				previous = 0
+				for e in xrange(lo, hi):
+					cid = suffixes[e]
+					if cid == END:
+						ok = length >= minlen
+					else:
+						ok = ends[targets[e]] & window and not doubled(name, cid)
+					if ok:
+						candidates.append((cid, e, weights[e] - previous))
+						allowed = allowed | (1 << cid)
+						total = total + weights[e] - previous
+					previous = weights[e]
+				if total == 0:
+					names.append(None)
+					break
+				entry = None
+				if basis is not None:
+					(cid, pos) = basis.find(pos, allowed)
+					if cid is not None:
+						for candidate in candidates:
+							if candidate[0] == cid:
+								entry = candidate
+								break
+				if entry is None:
+					r = get(total, "MarkovDict.choice")
+					for candidate in candidates:
+						r = r - candidate[2]
+						if r < 0:
+							entry = candidate
+							break
+				if entry[0] == END:
+					names.append(self.spell(name))
+					break
+				name.append(entry[0])
+				state = targets[entry[1]]
+		return names
 
+	def spell(self, cids):
+		chars = self.mcd.chars
+		return u"".join([chars[cid] for cid in cids])
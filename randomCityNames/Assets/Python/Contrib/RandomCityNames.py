@@ -11,101 +11,463 @@
 from CvPythonExtensions import *
 from Markov import *
 from CityNameLists import *
+from GeneratorRegistry import GeneratorRegistry
+import RandomSource
 import BugData
 import BugUtil
 
+import re
 import string
+import time
 
 gc = CyGlobalContext()
 
-GENERATORS = {}
+GENERATORS = GeneratorRegistry()
+
+# names generated before giving up on finding one that is not in use
+UNIQUE_TRIES = 10
+# names generated ahead for each civ
+POOL_SIZE = 4
+# seconds spent refilling the pools at the end of a turn and per frame
+TURN_BUDGET = 0.05
+FRAME_BUDGET = 0.002
+
+class DataCache(object):
+	"""
+	Write-behind cache of a BugData table.
+
+	Reads are served from a dict, falling back to BugData the first time a
+	key is read. Writes only touch the dict and mark the key dirty; flush()
+	copies the dirty keys to BugData, deletes the removed ones and saves
+	once, before the game is saved. clear() drops everything when another game is started or loaded.
+	"""
+
+	def __init__(self, name):
+		self.name = name
+		self.clear()
+
+	def clear(self):
+		self.values = {}
+		self.dirty = {}
+		self.removed = {}
+
+	def get(self, key):
+		try:
+			return self.values[key]
+		except KeyError:
+			table = BugData.getGameData().getTable(self.name)
+			if table.hasTable(key):
+				value = table.getTable(key)["val"]
+			else:
+				value = None
+			self.values[key] = value
+			return value
+
+	def set(self, key, value):
+		self.values[key] = value
+		self.dirty[key] = True
+		if key in self.removed:
+			del self.removed[key]
+
+	def remove(self, key):
+		self.values[key] = None
+		if key in self.dirty:
+			del self.dirty[key]
+		self.removed[key] = True
+
+	def flush(self):
+		if not self.dirty and not self.removed:
+			return
+		BugUtil.debug("%s: writing %d values, deleting %d" % (self.name, len(self.dirty), len(self.removed)))
+		table = BugData.getGameData().getTable(self.name)
+		for key in self.dirty.keys():
+			table.getTable(key)["val"] = self.values[key]
+		for key in self.removed.keys():
+			if table.hasTable(key):
+				table.delTable(key)
+		self.dirty = {}
+		self.removed = {}
+		BugData.save()
+
+DATA = DataCache("RandomCityNames")
+
+class ActiveGenerators(object):
+	"""
+	Civs whose generators have named a city in this game, at most one per
+	civ ever alive plus the barbarians, and the registered civs that have
+	not. Read from the saved state the first time it is needed after
+	clear(), then kept up to date in memory.
+	"""
+
+	def __init__(self):
+		self.clear()
+
+	def clear(self):
+		self.active = None
+		self.inactive = None
+		self.limit = 0
+
+	def populate(self):
+		self.active = DATA.get("ACTIVE_GENERATORS") or {}
+		self.inactive = [civ for civ in GENERATORS.keys() if civ not in self.active]
+		self.limit = 1 + gc.getGame().countCivPlayersEverAlive()
+
+	def activate(self, civ):
+		if self.active is None:
+			self.populate()
+		if civ in self.active:
+			return
+		if len(self.active) >= self.limit:
+			# a civ may have come to life since
+			self.limit = 1 + gc.getGame().countCivPlayersEverAlive()
+			if len(self.active) >= self.limit:
+				return
+		self.active[civ] = True
+		try:
+			self.inactive.remove(civ)
+		except ValueError:
+			pass
+		DATA.set("ACTIVE_GENERATORS", self.active)
+		# the new civ needs a name pool
+		POOLS.full = False
+
+	def getInactive(self):
+		if self.active is None:
+			self.populate()
+		return self.inactive
+
+	def getActive(self):
+		if self.active is None:
+			self.populate()
+		return self.active.keys()
+
+ACTIVE = ActiveGenerators()
+
+class NameIndex(object):
+	"""
+	Names of the cities on the map, with the number of cities using each.
+	Filled from the map by populate() and then kept up to date by the
+	city events.
+	"""
+
+	def __init__(self):
+		self.counts = {}
+
+	def populate(self):
+		self.counts = {}
+		for iPlayer in range(gc.getMAX_PLAYERS()):
+			player = gc.getPlayer(iPlayer)
+			if player.isAlive():
+				(loopCity, iter) = player.firstCity(False)
+				while (loopCity):
+					self.add(loopCity.getName())
+					(loopCity, iter) = player.nextCity(iter, False)
+
+	def add(self, name):
+		self.counts[name] = self.counts.get(name, 0) + 1
+
+	def remove(self, name):
+		count = self.counts.get(name, 0)
+		if count > 1:
+			self.counts[name] = count - 1
+		elif count:
+			del self.counts[name]
+
+	def __contains__(self, name):
+		return name in self.counts
+
+NAMES = NameIndex()
+
+class NamePools(object):
+	"""
+	Names generated ahead for the civ of each player alive, so that
+	founding a city only has to take one. The pools are part of the saved
+	state, so a reloaded game hands out the same names, and are refilled
+	between turns and on idle frames within a time budget. Nothing is
+	refilled until clear() is called for a game.
+	"""
+
+	def __init__(self):
+		self.pools = None
+		self.full = True
+
+	def clear(self):
+		self.pools = None
+		self.full = False
+
+	def getPools(self):
+		if self.pools is None:
+			self.pools = DATA.get("NAME_POOLS") or {}
+		return self.pools
+
+	def take(self, civ):
+		pool = self.getPools().get(civ)
+		while pool:
+			name = pool.pop(0)
+			self.full = False
+			DATA.set("NAME_POOLS", self.pools)
+			# another city may have been given the name since
+			if name not in NAMES:
+				return name
+		return None
+
+	def refill(self, seconds):
+		if self.full:
+			return
+		deadline = time.clock() + seconds
+		pools = self.getPools()
+		for civ in self.getCivs():
+			pool = pools.get(civ)
+			if pool is None:
+				pool = []
+				pools[civ] = pool
+			if len(pool) >= POOL_SIZE:
+				continue
+			# building a generator takes longer than a frame; generate() will
+			if not GENERATORS.isBuilt(civ):
+				continue
+			generator = GENERATORS[civ]
+			taken = {}
+			for name in pool:
+				taken[name] = True
+			DATA.set("NAME_POOLS", pools)
+			while len(pool) < POOL_SIZE:
+				remaining = deadline - time.clock()
+				if remaining <= 0:
+					return
+				name = generator.newUniqueName("", taken, Budget(seconds=min(remaining, GENERATION_TIME)))
+				taken[name] = True
+				pool.append(name)
+		self.full = True
+
+	def getCivs(self):
+		"""
+		The civs of the players alive, who may found a city.
+		"""
+		civs = []
+		for iPlayer in range(gc.getMAX_CIV_PLAYERS()):
+			player = gc.getPlayer(iPlayer)
+			if player.isAlive():
+				civ = gc.getCivilizationInfo(player.getCivilizationType()).getType()
+				if civ in GENERATORS and civ not in civs:
+					civs.append(civ)
+		return civs
+
+POOLS = NamePools()
+
+# plot indexes whose names saved by older versions have been moved into the history
+MIGRATED = {}
 
 def rcnGetDataValue(key):
-	counters = BugData.getGameData().getTable("RandomCityNames")
-	if (not counters.hasTable(key)):
-		result = None
-	else:
-		counter = counters.getTable(key)
-		result = counter["val"]
-	BugUtil.info("rcnGetDataValue(%s) => %s" % (key, result))
-	return result
+	return DATA.get(key)
 
 def rcnSetDataValue(key, value):
-	BugUtil.info("rcnSetDataValue(%s, %s)" % (key, value))
-	counters = BugData.getGameData().getTable("RandomCityNames")
-	counter = counters.getTable(key)
-	counter["val"] = value
-	BugData.save()
+	DATA.set(key, value)
+
+def flush():
+	"""
+	Writes the mod's changed state to BugData. Called before saving.
+	"""
+	DATA.flush()
+
+def load():
+	"""
+	Forgets the cached state, to be read again from the game being played.
+	"""
+	DATA.clear()
+	ACTIVE.clear()
+	NAMES.populate()
+	POOLS.clear()
+	MIGRATED.clear()
+
+def refill(budget):
+	"""
+	Generates names ahead for the civs in play for up to budget seconds.
+	"""
+	POOLS.refill(budget)
+
+def add_city_name(name):
+	"""
+	Records that a city on the map now has the given name.
+	"""
+	NAMES.add(name)
+
+def remove_city_name(name):
+	"""
+	Records that a city on the map no longer has the given name.
+	"""
+	NAMES.remove(name)
 
 class Generator(object):
 
 	def __init__(self, civ, trainingSet):
 		(self.minlen, self.maxlen) = limits(trainingSet)
 		self.markov_chain = MarkovChain(trainingSet, self.maxlen)
-		self.random = gc.getASyncRand()
+		# built with the generator rather than by its first name, which may be refilling a pool
+		self.markov_chain.endings()
+		self.random = RandomSource.RANDOM
 		self.civ = civ
-		GENERATORS[self.civ] = self
+		self.customizer = CUSTOMIZERS.get(civ, DEFAULT_CUSTOMIZER)
+		self.training = frozenset([unicode(l) for l in trainingSet])
 
 	def customize(self, result):
-		base = result.title()
-		res = u""
-		for c in base:
-			if res == u"'":
-				res = res + c.capitalize()
-			elif res.endswith(u"'"):
-				res = res + c.lower()
-			else:
-				res = res + c
-		return res
+		return self.customizer.apply(result, self.choice)
 
 	def generate(self, previous_name=""):
 		self.activate()
-		result = ""
-		# loopcount guarantees termination
-		loopcount = 0
-		while (len(result) < self.minlen or len(result) > self.maxlen) and loopcount < self.minlen:
-			result = self.markov_chain.newName(previous_name)
-			loopcount = loopcount + 1
-		return self.customize(result)
+		return self.newUniqueName(previous_name)
+
+	def generate_many(self, n, previous_name="", taken=None):
+		"""
+		Generates n names at once, all different and none in taken, which
+		is updated with them. The raw names come from one batch of the
+		Markov chain; only those that collide are generated again.
+		"""
+		self.activate()
+		if taken is None:
+			taken = {}
+		names = []
+		for name in self.newNames(n, previous_name):
+			name = self.customize(name)
+			if not self.isFree(name, taken):
+				name = self.newUniqueName(previous_name, taken)
+			taken[name] = True
+			names.append(name)
+		return names
+
+	def newUniqueName(self, previous_name="", taken=None, budget=None):
+		"""
+		A customized name that no city on the map has, that is not simply
+		copied from the training list and is not in taken. If none is found
+		in UNIQUE_TRIES attempts, the fallback is counted and the last
+		generated name is numbered until it is free; a training name is only
+		numbered when every attempt fell back to the training list. budget
+		bounds the time spent on the attempts.
+		"""
+		if budget is None:
+			budget = Budget()
+		generated = None
+		for i in xrange(UNIQUE_TRIES):
+			raw = self.newName(previous_name, budget)
+			name = self.customize(raw)
+			if self.isFree(name, taken):
+				return name
+			if raw not in self.training:
+				generated = name
+		countFallback(self.civ + "/unique")
+		if generated is not None:
+			name = generated
+		base = name
+		i = 2
+		while not self.isFree(name, taken):
+			name = u"%s %d" % (base, i)
+			i = i + 1
+		return name
+
+	def isFree(self, name, taken=None):
+		if name in NAMES or name in self.training:
+			return False
+		return taken is None or name not in taken
+
+	def newName(self, previous_name="", budget=None):
+		return self.markov_chain.newNameWithin(self.minlen, self.maxlen, previous_name, budget, self.civ)
+
+	def newNames(self, n, previous_name=""):
+		return self.markov_chain.newNamesWithin(n, self.minlen, self.maxlen, previous_name, self.civ)
 
 	def activate(self):
-		active_generators = rcnGetDataValue("ACTIVE_GENERATORS") or {}
-		maxActive = 1 + gc.getGame().countCivPlayersEverAlive()
-		if len(active_generators) < maxActive:
-			active_generators[self.civ] = True
-			rcnSetDataValue("ACTIVE_GENERATORS", active_generators)
+		ACTIVE.activate(self.civ)
 
 	def choice(self, l):
 		return l[self.random.get(len(l), "Generator.choice")]
 
-	def force_case(self, name, *strs):
-		for str in strs:
-			upname = name.upper()
-			upstr = str.upper()
-			index = upname.find(upstr)
-			length = len(str)
-			while index >= 0:
-				name = name[0:index] + str + name[index+length:]
-				upname = upname[0:index] + str + upname[index+length:]
-				index = upname.find(str, index + 1)
-		return name
-
-	def force_ending(self, result, trigger, choices):
-		res = result
-		index = result.find(trigger, 0)
-		while index >= 0:
-			words = result[index+len(trigger):].split()
-			if not ends_with(words[0], choices):
-				res = res.replace(words[0], words[0] + self.choice(choices))
-			index = result.find(trigger, index + 1)
-		return res
-
 def ends_with(str, endings):
 	for ending in endings:
 		if str.endswith(ending):
 			return True
 	return False
 
+class Customizer(object):
+	"""
+	Rules that turn a raw Markov name into a proper one for a civ, compiled
+	into a single regular expression so every name is handled in one pass.
+
+	The name is title cased, and a letter following an apostrophe is
+	lowercased unless the apostrophe starts the name. Each word in case is
+	then forced to that case wherever it appears. Each (trigger, choices)
+	in endings makes the word after trigger end with one of the choices,
+	appending a random one if it doesn't. Each (old, new) in fixups is
+	finally replaced throughout.
+	"""
+
+	def __init__(self, case=(), endings=(), fixups=()):
+		self.fixups = fixups
+		self.actions = [None]
+		alternatives = []
+		folded = {}
+		for word in case:
+			folded[word.lower()] = True
+		for (trigger, choices) in endings:
+			# a case word ending in a space may have taken the space first
+			pattern = self.literal(trigger, folded.has_key(trigger.lower()))
+			alternatives.append("( ?%s)(\\S+)" % pattern)
+			self.actions.append(None)
+			self.actions.append(("ending", choices))
+		words = list(case)
+		words.sort(lambda a, b: cmp(len(b), len(a)))
+		for word in words:
+			# a closing space or dash is only looked at, so that it can
+			# also open the next word
+			if word[-1:] in (" ", "-"):
+				alternatives.append("(%s)(?=%s)" % (self.literal(word[:-1], True), re.escape(word[-1])))
+				self.actions.append(("case", word[:-1]))
+			else:
+				alternatives.append("(%s)" % self.literal(word, True))
+				self.actions.append(("case", word))
+		alternatives.append("^'(.)")
+		self.actions.append(("upper", None))
+		alternatives.append("(?<=.')(.)")
+		self.actions.append(("lower", None))
+		self.pattern = re.compile("|".join(alternatives), re.UNICODE | re.DOTALL)
+
+	def literal(self, text, fold):
+		pattern = u""
+		for c in text:
+			if fold and c.lower() != c.upper():
+				pattern = pattern + u"[%s%s]" % (re.escape(c.lower()), re.escape(c.upper()))
+			else:
+				pattern = pattern + re.escape(c)
+		return pattern
+
+	def apply(self, name, choice):
+		res = self.render(name.title(), 0, len(name), choice)
+		for (old, new) in self.fixups:
+			res = res.replace(old, new)
+		return res
+
+	def render(self, text, start, end, choice):
+		pieces = []
+		last = start
+		for match in self.pattern.finditer(text, start, end):
+			pieces.append(text[last:match.start()])
+			(action, arg) = self.actions[match.lastindex]
+			if action == "case":
+				pieces.append(arg)
+			elif action == "upper":
+				pieces.append(u"'" + match.group(match.lastindex).upper())
+			elif action == "lower":
+				pieces.append(match.group(match.lastindex).lower())
+			else:
+				group = match.lastindex
+				pieces.append(self.render(text, match.start(group - 1), match.end(group - 1), choice))
+				word = self.render(text, match.start(group), match.end(group), choice)
+				pieces.append(word)
+				if not ends_with(word, arg):
+					pieces.append(choice(arg))
+			last = match.end()
+		pieces.append(text[last:end])
+		return u"".join(pieces)
+
 def limits(trainingSet):
 	mn = 30
 	mx = 0
@@ -120,15 +482,77 @@ def generate(city, previous_name=""):
 		strCivilizationType = gc.getCivilizationInfo(iCivilizationType).getType()
 		if GENERATORS.has_key(strCivilizationType):
 			generator = GENERATORS[strCivilizationType]
+			if not previous_name:
+				name = POOLS.take(strCivilizationType)
+				if name is not None:
+					generator.activate()
+					return name
 			return generator.generate(previous_name)
 	return city.getName()
 
+def plot_index(x, y):
+	return (x << 16) | y
+
+def get_history():
+	"""
+	Names cities have had under each owner, as one dict keyed by
+	plot_index() of the city's plot, each holding an {owner: name} dict.
+	"""
+	history = rcnGetDataValue("NAME_HISTORY")
+	if history is None:
+		history = {}
+	return history
+
 def save_name(city, previous_owner):
-	key = get_saved_name_key(city, previous_owner)
-	rcnSetDataValue(key, city.getName())
+	history = get_history()
+	index = plot_index(city.getX(), city.getY())
+	names = history.get(index)
+	if names is None:
+		names = {}
+		history[index] = names
+	names[previous_owner] = city.getName()
+	rcnSetDataValue("NAME_HISTORY", history)
+
+def get_plot_names(city):
+	"""
+	The {owner: name} dict of the city's plot in the history, or None.
+	Names saved by older versions of the mod, under one key per owner, are
+	moved into it the first time the plot is read in a session, and their
+	keys dropped by the next flush().
+	"""
+	history = get_history()
+	index = plot_index(city.getX(), city.getY())
+	if index not in MIGRATED:
+		MIGRATED[index] = True
+		table = BugData.getGameData().getTable(DATA.name)
+		changed = False
+		for iPlayer in range(gc.getMAX_PLAYERS()):
+			key = get_saved_name_key(city, iPlayer)
+			if table.hasTable(key):
+				name = table.getTable(key)["val"]
+				DATA.remove(key)
+				names = history.setdefault(index, {})
+				if name is not None and iPlayer not in names:
+					names[iPlayer] = name
+					changed = True
+		if changed:
+			rcnSetDataValue("NAME_HISTORY", history)
+	return history.get(index)
 
 def get_previous_name(city, previous_owner):
-	return rcnGetDataValue(get_saved_name_key(city, previous_owner))
+	names = get_plot_names(city)
+	if names is not None:
+		return names.get(previous_owner)
+	return None
+
+def get_name_history(city):
+	"""
+	The names the city has had, as an {owner: name} dict.
+	"""
+	names = get_plot_names(city)
+	if names is None:
+		return {}
+	return names.copy()
 
 def get_saved_name_key(city, owner):
 	x = city.getX()
@@ -144,6 +568,107 @@ def rename(city, previous_owner, new_owner):
 	else:
 		return generate(city, city.getName())
 
+def rename_all(players=None):
+	"""
+	Gives every city of the given players (all players by default) a new
+	name, generated in one batch per player, records the new names in the
+	history and writes the state once. Returns the number of cities renamed.
+	"""
+	if players is None:
+		players = range(gc.getMAX_PLAYERS())
+	count = 0
+	for iPlayer in players:
+		player = gc.getPlayer(iPlayer)
+		if not player.isAlive():
+			continue
+		civ = gc.getCivilizationInfo(player.getCivilizationType()).getType()
+		if not GENERATORS.has_key(civ):
+			continue
+		cities = []
+		(loopCity, iter) = player.firstCity(False)
+		while (loopCity):
+			cities.append(loopCity)
+			(loopCity, iter) = player.nextCity(iter, False)
+		if not cities:
+			continue
+		names = GENERATORS[civ].generate_many(len(cities))
+		for i in range(len(cities)):
+			city = cities[i]
+			NAMES.remove(city.getName())
+			city.setName(names[i], False)
+			NAMES.add(city.getName())
+			save_name(city, iPlayer)
+		count = count + len(cities)
+	BugUtil.debug("rename_all: renamed %d cities" % count)
+	flush()
+	return count
+
+def warm():
+	"""
+	Builds the generators for the civs in the current game.
+	"""
+	civs = ["CIVILIZATION_BARBARIAN"]
+	for iPlayer in range(gc.getMAX_CIV_PLAYERS()):
+		player = gc.getPlayer(iPlayer)
+		if player.isEverAlive():
+			civs.append(gc.getCivilizationInfo(player.getCivilizationType()).getType())
+	GENERATORS.warm(civs)
+	MARKOV_CACHE.save()
+
+CUSTOMIZATION_RULES = {
+	"CIVILIZATION_AMERICA": {
+		"endings": (("Las ", ("as", "es")), ("Los ", ("es", "os"))),
+	},
+	"CIVILIZATION_ENGLAND": {
+		"case": (" of ", " upon ", "-on-", "-under-"),
+	},
+	"CIVILIZATION_FRANCE": {
+		"case": (
+			"-aux-", "-d'", "-de-", "-des-", "du", "-en-", "-et-", "-l'", "-la-", "-le-", "-les-", "-sous-",
+			"-sur-", u"-lÃ¨s-"
+		),
+		"endings": (
+			("Les ", ("s", "aux")), ("-aux-", ("s", "aux")), ("-des-", ("s", "aux")), ("-les-", ("s", "aux"))
+		),
+	},
+	"CIVILIZATION_GERMANY": {
+		"case": (" am ", " an ", " der ", " im ", " in ", " vor "),
+	},
+	"CIVILIZATION_GREECE": {
+		"endings": (
+			(u"Agía ", ("a", "i")), (u"Ágioi ", ("oi",)), (u"Ágios ", ("is", "os")),
+			(u"Néa ", (u"ós", "a", "i", u"ás")), (u"Néo ", (u"ó",))
+		),
+	},
+	"CIVILIZATION_NETHERLANDS": {
+		"case": ("'s-", " aan ", " bij ", " de ", " den ", " en ", "het ", " op "),
+		"fixups": (("Ij", "IJ"),),
+	},
+	"CIVILIZATION_PERSIA": {
+		"case": ("-e ", "-ye ", " va "),
+	},
+	"CIVILIZATION_PORTUGAL": {
+		"case": ("-o-", " da ", " de ", " do "),
+	},
+	"CIVILIZATION_ROME": {
+		"case": ("ad ", " apud ", " fluvium ", " super "),
+	},
+	"CIVILIZATION_RUSSIA": {
+		"case": ("-na-",),
+	},
+	"CIVILIZATION_SPAIN": {
+		"case": (" de ", " del ", " el ", " i ", " la ", " las ", " los "),
+		"endings": (("Las ", ("as", "es")), ("Los ", ("es", "os")), ("Dos ", ("as", "es", "os"))),
+		"fixups": (("L'h", "L'H"),),
+	},
+}
+CUSTOMIZATION_RULES["CIVILIZATION_HOLY_ROMAN"] = CUSTOMIZATION_RULES["CIVILIZATION_GERMANY"]
+
+DEFAULT_CUSTOMIZER = Customizer()
+CUSTOMIZERS = {}
+for (civ, rules) in CUSTOMIZATION_RULES.items():
+	CUSTOMIZERS[civ] = Customizer(rules.get("case", ()), rules.get("endings", ()), rules.get("fixups", ()))
+
 class AmericanGenerator(Generator):
 
 	def __init__(self, civ, trainingSet):
@@ -151,120 +676,11 @@ class AmericanGenerator(Generator):
 
 	def customize(self, result):
 		res = Generator.customize(self, result)
-		res = self.force_ending(res, 'Las ', ['as', 'es'])
-		res = self.force_ending(res, 'Los ', ['es', 'os'])
 		if res.startswith('Mc'):
 			return 'Mc' + res[2:].title()
 		else:
 			return res
 
-class EnglishGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(EnglishGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, " of ", " upon ", "-on-", "-under-")
-		return res
-
-class FrenchGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(FrenchGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(
-			res,
-			"-aux-", "-d'", "-de-", "-des-", "du", "-en-", "-et-", "-l'", "-la-", "-le-", "-les-", "-sous-",
-			"-sur-", u"-lÃ¨s-"
-		)
-		res = self.force_ending(res, 'Les ', ['s', 'aux'])
-		res = self.force_ending(res, '-aux-', ['s', 'aux'])
-		res = self.force_ending(res, '-des-', ['s', 'aux'])
-		res = self.force_ending(res, '-les-', ['s', 'aux'])
-		return res
-
-class GermanGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(GermanGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, " am ", " an ", " der ", " im ", " in ", " vor ")
-		return res
-
-class GreekGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(GreekGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_ending(res, u"Agía ", ["a", "i"])
-		res = self.force_ending(res, u"Ágioi ", ["oi"])
-		res = self.force_ending(res, u"Ágios ", ["is", "os"])
-		res = self.force_ending(res, u"Néa ", [u"ós", "a", "i", u"ás"])
-		res = self.force_ending(res, u"Néo ", [u"ó"])
-		return res
-
-class DutchGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(DutchGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, "'s-", " aan ", " bij ", " de ", " den ", " en ", "het ", " op ")
-		res = res.replace("Ij", "IJ")
-		return res
-
-class PersianGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(PersianGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, "-e ", "-ye ", " va ")
-		return res
-
-class PortugueseGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(PortugueseGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, "-o-", " da ", " de ", " do ")
-		return res
-
-class RomanGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(RomanGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, "ad ", " apud ", " fluvium ", " super ")
-		return res
-
-class RussianGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(RussianGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_case(res, "-na-")
-		return res
-
-class SpanishGenerator(Generator):
-	def __init__(self, civ, trainingSet):
-		super(SpanishGenerator, self).__init__(civ, trainingSet)
-
-	def customize(self, result):
-		res = Generator.customize(self, result)
-		res = self.force_ending(res, "Las ", ["as", "es"])
-		res = self.force_ending(res, "Los ", ["es", "os"])
-		res = self.force_ending(res, "Dos ", ["as", "es", "os"])
-		res = self.force_case(res, " de ", " del ", " el ", " i ", " la ", " las ", " los ")
-		res = res.replace("L'h", "L'H")
-		return res
-
 class ZuluGenerator(Generator):
 	def __init__(self, civ, trainingSet):
 		super(ZuluGenerator, self).__init__(civ, trainingSet)
@@ -282,6 +698,7 @@ class ZuluGenerator(Generator):
 class BarbarianGenerator(Generator):
 	def __init__(self, civ):
 		super(BarbarianGenerator, self).__init__(civ, [])
+		self.others = None
 
 	def generate(self, previous_name=""):
 		self.activate()
@@ -289,46 +706,71 @@ class BarbarianGenerator(Generator):
 		delegate = GENERATORS[civ]
 		return delegate.generate(previous_name)
 
+	def generate_many(self, n, previous_name="", taken=None):
+		"""
+		Picks a delegate for each of the n names and has each delegate
+		generate its share in one batch, all sharing taken.
+		"""
+		self.activate()
+		if taken is None:
+			taken = {}
+		counts = {}
+		civs = []
+		for i in xrange(n):
+			civ = self.choose_delegate()
+			if civ not in counts:
+				counts[civ] = 0
+				civs.append(civ)
+			counts[civ] = counts[civ] + 1
+		names = []
+		for civ in civs:
+			names.extend(GENERATORS[civ].generate_many(counts[civ], previous_name, taken))
+		return names
+
 	def choose_delegate(self):
-		active_generators = rcnGetDataValue("ACTIVE_GENERATORS") or {}
-		civs = [civ for civ in GENERATORS.keys() if civ not in active_generators.keys()]
+		civs = ACTIVE.getInactive()
 		if len(civs) == 0:
-			civs = [civ for civ in GENERATORS.keys() if civ != self.civ]
+			if self.others is None:
+				self.others = [civ for civ in GENERATORS.keys() if civ != self.civ]
+			civs = self.others
 		return self.choice(civs)
 
 
-AMERICAN_GENERATOR = AmericanGenerator("CIVILIZATION_AMERICA", AMERICAN_CITIES)
-ARABIAN_GENERATOR = Generator("CIVILIZATION_ARABIA", ARABIAN_CITIES)
-AZTEC_GENERATOR = Generator("CIVILIZATION_AZTEC", AZTEC_CITIES)
-BABYLONIAN_GENERATOR = Generator("CIVILIZATION_BABYLON", BABYLONIAN_CITIES)
-BYZANTINE_GENERATOR = Generator("CIVILIZATION_BYZANTIUM", BYZANTINE_CITIES)
-CARTHAGINIAN_GENERATOR = Generator("CIVILIZATION_CARTHAGE", CARTHAGINIAN_CITIES)
-CELTIC_GENERATOR = Generator("CIVILIZATION_CELT", CELTIC_CITIES)
-CHINESE_GENERATOR = Generator("CIVILIZATION_CHINA", CHINESE_CITIES)
-EGYPTIAN_GENERATOR = Generator("CIVILIZATION_EGYPT", EGYPTIAN_CITIES)
-ENGLISH_GENERATOR = EnglishGenerator("CIVILIZATION_ENGLAND", ENGLISH_CITIES)
-ETHIOPIAN_GENERATOR = Generator("CIVILIZATION_ETHIOPIA", ETHIOPIAN_CITIES)
-FRENCH_GENERATOR = FrenchGenerator("CIVILIZATION_FRANCE", FRENCH_CITIES)
-GERMAN_GENERATOR = GermanGenerator("CIVILIZATION_GERMANY", GERMAN_CITIES)
-GREEK_GENERATOR = GreekGenerator("CIVILIZATION_GREECE", GREEK_CITIES)
-HOLY_ROMAN_GENERATOR = GermanGenerator("CIVILIZATION_HOLY_ROMAN", HOLY_ROMAN_CITIES)
-INCA_GENERATOR = Generator("CIVILIZATION_INCA", INCA_CITIES)
-INDIAN_GENERATOR = Generator("CIVILIZATION_INDIA", INDIAN_CITIES)
-JAPANESE_GENERATOR = Generator("CIVILIZATION_JAPAN", JAPANESE_CITIES)
-KHMER_GENERATOR = Generator("CIVILIZATION_KHMER", KHMER_CITIES)
-KOREAN_GENERATOR = Generator("CIVILIZATION_KOREA", KOREAN_CITIES)
-MALIAN_GENERATOR = Generator("CIVILIZATION_MALI", MALIAN_CITIES)
-MAYA_GENERATOR = Generator("CIVILIZATION_MAYA", MAYA_CITIES)
-MONGOL_GENERATOR = Generator("CIVILIZATION_MONGOL", MONGOL_CITIES)
-NATIVE_AMERICAN_GENERATOR = Generator("CIVILIZATION_NATIVE_AMERICA", NATIVE_AMERICAN_CITIES)
-DUTCH_GENERATOR = DutchGenerator("CIVILIZATION_NETHERLANDS", DUTCH_CITIES)
-OTTOMAN_GENERATOR = Generator("CIVILIZATION_OTTOMAN", OTTOMAN_CITIES)
-PERSIAN_GENERATOR = PersianGenerator("CIVILIZATION_PERSIA", PERSIAN_CITIES)
-PORTUGUESE_GENERATOR = PortugueseGenerator("CIVILIZATION_PORTUGAL", PORTUGUESE_CITIES)
-ROMAN_GENERATOR = RomanGenerator("CIVILIZATION_ROME", ROMAN_CITIES)
-RUSSIAN_GENERATOR = RussianGenerator("CIVILIZATION_RUSSIA", RUSSIAN_CITIES)
-SPANISH_GENERATOR = SpanishGenerator("CIVILIZATION_SPAIN", SPANISH_CITIES)
-SUMERIAN_GENERATOR = Generator("CIVILIZATION_SUMERIA", SUMERIAN_CITIES)
-VIKING_GENERATOR = Generator("CIVILIZATION_VIKING", VIKING_CITIES)
-ZULU_GENERATOR = ZuluGenerator("CIVILIZATION_ZULU", ZULU_CITIES)
-BARBARIAN_GENERATOR = BarbarianGenerator("CIVILIZATION_BARBARIAN")
+def register(cls, civ, *args):
+	GENERATORS.register(civ, cls, civ, *args)
+
+register(AmericanGenerator, "CIVILIZATION_AMERICA", AMERICAN_CITIES)
+register(Generator, "CIVILIZATION_ARABIA", ARABIAN_CITIES)
+register(Generator, "CIVILIZATION_AZTEC", AZTEC_CITIES)
+register(Generator, "CIVILIZATION_BABYLON", BABYLONIAN_CITIES)
+register(Generator, "CIVILIZATION_BYZANTIUM", BYZANTINE_CITIES)
+register(Generator, "CIVILIZATION_CARTHAGE", CARTHAGINIAN_CITIES)
+register(Generator, "CIVILIZATION_CELT", CELTIC_CITIES)
+register(Generator, "CIVILIZATION_CHINA", CHINESE_CITIES)
+register(Generator, "CIVILIZATION_EGYPT", EGYPTIAN_CITIES)
+register(Generator, "CIVILIZATION_ENGLAND", ENGLISH_CITIES)
+register(Generator, "CIVILIZATION_ETHIOPIA", ETHIOPIAN_CITIES)
+register(Generator, "CIVILIZATION_FRANCE", FRENCH_CITIES)
+register(Generator, "CIVILIZATION_GERMANY", GERMAN_CITIES)
+register(Generator, "CIVILIZATION_GREECE", GREEK_CITIES)
+register(Generator, "CIVILIZATION_HOLY_ROMAN", HOLY_ROMAN_CITIES)
+register(Generator, "CIVILIZATION_INCA", INCA_CITIES)
+register(Generator, "CIVILIZATION_INDIA", INDIAN_CITIES)
+register(Generator, "CIVILIZATION_JAPAN", JAPANESE_CITIES)
+register(Generator, "CIVILIZATION_KHMER", KHMER_CITIES)
+register(Generator, "CIVILIZATION_KOREA", KOREAN_CITIES)
+register(Generator, "CIVILIZATION_MALI", MALIAN_CITIES)
+register(Generator, "CIVILIZATION_MAYA", MAYA_CITIES)
+register(Generator, "CIVILIZATION_MONGOL", MONGOL_CITIES)
+register(Generator, "CIVILIZATION_NATIVE_AMERICA", NATIVE_AMERICAN_CITIES)
+register(Generator, "CIVILIZATION_NETHERLANDS", DUTCH_CITIES)
+register(Generator, "CIVILIZATION_OTTOMAN", OTTOMAN_CITIES)
+register(Generator, "CIVILIZATION_PERSIA", PERSIAN_CITIES)
+register(Generator, "CIVILIZATION_PORTUGAL", PORTUGUESE_CITIES)
+register(Generator, "CIVILIZATION_ROME", ROMAN_CITIES)
+register(Generator, "CIVILIZATION_RUSSIA", RUSSIAN_CITIES)
+register(Generator, "CIVILIZATION_SPAIN", SPANISH_CITIES)
+register(Generator, "CIVILIZATION_SUMERIA", SUMERIAN_CITIES)
+register(Generator, "CIVILIZATION_VIKING", VIKING_CITIES)
+register(ZuluGenerator, "CIVILIZATION_ZULU", ZULU_CITIES)
+register(BarbarianGenerator, "CIVILIZATION_BARBARIAN")
@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Shared random number source for the name generators
+# By: duckstab (James Conrad Shea)
+###############################################################################
+
+from CvPythonExtensions import *
+import random
+
+gc = CyGlobalContext()
+
+# largest range accepted by ASyncRand.get (an unsigned short)
+RAND_RANGE = 0xFFFF
+# backend values that seed each block, and the numbers drawn from a block
+SEED_VALUES = 4
+RAND_BLOCK = 256
+
+class SeededRandom:
+	"""
+	Pure Python backend with the same get(n, reason) signature as
+	ASyncRand, for running the generators outside the game.
+	"""
+
+	def __init__(self, seed=None):
+		self.rng = random.Random(seed)
+
+	def seed(self, seed):
+		self.rng.seed(seed)
+
+	def get(self, n, reason=None):
+		if n <= 1:
+			return 0
+		return self.rng.randrange(n)
+
+class RandomSource:
+	"""
+	Random numbers drawn from a local generator.
+
+	Each call to the backend (by default the game's ASyncRand) crosses into
+	the DLL. So every block of up to RAND_BLOCK numbers is drawn from a
+	Python generator seeded with SEED_VALUES values from the backend, and
+	only the reseeding calls the backend. Nothing is fetched until the
+	first number is asked for.
+	"""
+
+	def __init__(self, backend=None, size=RAND_BLOCK):
+		self.backend = backend
+		self.size = max(size, 1)
+		self.rng = random.Random()
+		self.left = 0
+
+	def setBackend(self, backend):
+		"""
+		Switches to another backend, dropping the block seeded by the old one.
+		"""
+		self.backend = backend
+		self.left = 0
+
+	def getBackend(self):
+		if self.backend is None:
+			self.backend = gc.getASyncRand()
+		return self.backend
+
+	def reseed(self, count=0):
+		"""
+		Starts a new block of at least count numbers.
+		"""
+		get = self.getBackend().get
+		seed = 0
+		for i in xrange(SEED_VALUES):
+			seed = seed * RAND_RANGE + get(RAND_RANGE, "RandomSource.reseed")
+		self.rng.seed(seed)
+		self.left = max(self.size, count)
+
+	def reserve(self, count):
+		"""
+		Makes sure the next count numbers come from the same block, so that
+		a batch reseeds at most once.
+		"""
+		if self.left < count:
+			self.reseed(count)
+
+	def get(self, n, reason=None):
+		if n <= 1:
+			return 0
+		if self.left <= 0:
+			self.reseed()
+		self.left = self.left - 1
+		return int(self.rng.random() * n)
+
+# the source shared by Markov, RandomCityNames and RandomNameUtils
+RANDOM = RandomSource()
+
+def getRandom():
+	return RANDOM
+
+def setBackend(backend):
+	RANDOM.setBackend(backend)
+
+def seed(seed):
+	"""
+	Switches the shared source to a pure Python backend with the given seed.
+	"""
+	RANDOM.setBackend(SeededRandom(seed))
@@ -20,6 +20,8 @@ import sys
 import CvWorldBuilderScreen
 import CvAdvisorUtils
 import CvTechChooser
+import StartupProfile
+StartupProfile.install()
 import RandomCityNames
 import RandomNameUtils
 
@@ -31,6 +33,9 @@ PyInfo = PyHelpers.PyInfo
 
 # globals
 ###################################################
+# popup context of the Ctrl-Alt-R confirmation
+EventRenameAllCities = CvUtil.getNewEventID("RandomCityNames.RenameAll")
+
 class CvEventManager:
 	def __init__(self):
 		#################### ON EVENT MAP ######################
@@ -173,6 +178,7 @@ class CvEventManager:
 			CvUtil.EventWBScriptPopup : ('WBScriptPopup', self.__eventWBScriptPopupApply, self.__eventWBScriptPopupBegin),
 			CvUtil.EventWBStartYearPopup : ('WBStartYearPopup', self.__eventWBStartYearPopupApply, self.__eventWBStartYearPopupBegin),
 			CvUtil.EventShowWonder: ('ShowWonder', self.__eventShowWonderApply, self.__eventShowWonderBegin),
+			EventRenameAllCities: ('RenameAllCities', self.__eventRenameAllCitiesApply, self.__eventRenameAllCitiesBegin),
 		}	
 #################### EVENT STARTERS ######################
 	def handleEvent(self, argsList):
@@ -204,7 +210,7 @@ class CvEventManager:
 		
 		entry = self.Events[context]
 				
-		if ( context not in CvUtil.SilentEvents ):
+		if ( context not in CvUtil.SilentEvents and context != EventRenameAllCities ):
 			self.reportEvent(entry, context, (playerID, netUserData, popupReturn) )
 		return entry[1]( playerID, netUserData, popupReturn )   # the apply function
 
@@ -233,6 +239,12 @@ class CvEventManager:
 			theKey=int(key)
 			
 			CvCameraControls.g_CameraControls.handleInput( theKey )
+			
+			# Ctrl - Alt - R (Random City Names - rename every city after confirming, single player only)
+			if (theKey == int(InputTypes.KB_R) and self.bCtrl and self.bAlt
+			and not game.isNetworkMultiPlayer()):
+				self.beginEvent(EventRenameAllCities)
+				return 1
 						
 			if (self.bAllowCheats):
 				# Shift - T (Debug - No MP)
@@ -305,6 +317,8 @@ class CvEventManager:
 		# allow camera to be updated
 		CvCameraControls.g_CameraControls.onUpdate( fDeltaTime )
 		
+		RandomCityNames.refill(RandomCityNames.FRAME_BUDGET)
+		
 	def onWindowActivation(self, argsList):
 		'Called when the game window activates or deactivates'
 		bActive = argsList[0]
@@ -316,6 +330,7 @@ class CvEventManager:
 	def onPreSave(self, argsList):
 		"called before a game is actually saved"
 		CvUtil.pyPrint('OnPreSave')
+		RandomCityNames.flush()
 	
 	def onSaveGame(self, argsList):
 		"return the string to be saved - Must be a string"
@@ -323,6 +338,9 @@ class CvEventManager:
 
 	def onLoadGame(self, argsList):
 		CvAdvisorUtils.resetNoLiberateCities()
+		RandomCityNames.load()
+		RandomCityNames.warm()
+		StartupProfile.report()
 		return 0
 
 	def onGameStart(self, argsList):
@@ -348,6 +366,9 @@ class CvEventManager:
 					popupInfo.addPopup(iPlayer)
 
 		CvAdvisorUtils.resetNoLiberateCities()
+		RandomCityNames.load()
+		RandomCityNames.warm()
+		StartupProfile.report()
 																	
 	def onGameEnd(self, argsList):
 		'Called at the End of the game'
@@ -362,6 +383,7 @@ class CvEventManager:
 	def onEndGameTurn(self, argsList):
 		'Called at the end of the end of each turn'
 		iGameTurn = argsList[0]
+		RandomCityNames.refill(RandomCityNames.TURN_BUDGET)
 		
 	def onBeginPlayerTurn(self, argsList):
 		'Called at the beginning of a players turn'
@@ -821,6 +843,7 @@ class CvEventManager:
 		'City Built'
 		city = argsList[0]
 		city.setName(RandomCityNames.generate(city), False)
+		RandomCityNames.add_city_name(city.getName())
 		if (city.getOwner() == gc.getGame().getActivePlayer()):
 			self.__eventEditCityNameBegin(city, False)	
 		CvUtil.pyPrint('City Built Event: %s' %(city.getName()))
@@ -829,6 +852,7 @@ class CvEventManager:
 		'City Razed'
 		city, iPlayer = argsList
 		iOwner = city.findHighestCulture()
+		RandomCityNames.remove_city_name(city.getName())
 		
 		# Partisans!
 		if city.getPopulation > 1 and iOwner != -1 and iPlayer != -1:
@@ -845,7 +869,9 @@ class CvEventManager:
 	def onCityAcquired(self, argsList):
 		'City Acquired'
 		iPreviousOwner,iNewOwner,pCity,bConquest,bTrade = argsList
+		RandomCityNames.remove_city_name(pCity.getName())
 		pCity.setName(RandomCityNames.rename(pCity, iPreviousOwner, iNewOwner), False)
+		RandomCityNames.add_city_name(pCity.getName())
 		CvUtil.pyPrint('City Acquired Event: %s' %(pCity.getName()))
 	
 	def onCityAcquiredAndKept(self, argsList):
@@ -975,7 +1001,9 @@ class CvEventManager:
 		cityName = popupReturn.getEditBoxString(0)
 		if (len(cityName) > 30):
 			cityName = cityName[:30]
+		RandomCityNames.remove_city_name(city.getName())
 		city.setName(cityName, not bRename)
+		RandomCityNames.add_city_name(city.getName())
 
 	def __eventEditCityBegin(self, argsList):
 		'Edit City Event'
@@ -1031,6 +1059,18 @@ class CvEventManager:
 			newName = newName[:25]			
 		unit.setName(newName)
 
+	def __eventRenameAllCitiesBegin(self, argsList):
+		popup = PyPopup.PyPopup(EventRenameAllCities, EventContextTypes.EVENTCONTEXT_SELF)
+		popup.setHeaderString("Random City Names")
+		popup.setBodyString("Give every city on the map a new random name? The names the cities have now cannot be restored.")
+		popup.addButton(localText.getText("TXT_KEY_POPUP_YES", ()))
+		popup.addButton(localText.getText("TXT_KEY_POPUP_NO", ()))
+		popup.launch(False)
+
+	def __eventRenameAllCitiesApply(self, playerID, userData, popupReturn):
+		if (popupReturn.getButtonClicked() == 0):
+			RandomCityNames.rename_all()
+
 	def __eventWBAllPlotsPopupBegin(self, argsList):
 		CvScreensInterface.getWorldBuilderScreen().allPlotsCB()
 		return
@@ -0,0 +1,63 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Lazy registry of name generators
+# By: duckstab (James Conrad Shea)
+###############################################################################
+
+import StartupProfile
+
+class GeneratorRegistry(object):
+	"""
+	Name generators by civilization type.
+
+	Each civ is registered with a factory and its arguments. The generator
+	is only built (and its Markov chains trained) the first time it is
+	looked up, so the cost of loading the mod scales with the civs that are
+	actually in play. keys() and has_key() never build anything.
+	"""
+
+	def __init__(self):
+		self.factories = {}
+		self.generators = {}
+
+	def register(self, civ, factory, *args):
+		self.factories[civ] = (factory, args)
+		if civ in self.generators:
+			del self.generators[civ]
+
+	def __getitem__(self, civ):
+		generator = self.generators.get(civ)
+		if generator is None:
+			(factory, args) = self.factories[civ]
+			generator = StartupProfile.build(civ, factory, args)
+			self.generators[civ] = generator
+		return generator
+
+	def __contains__(self, civ):
+		return civ in self.factories
+
+	def __len__(self):
+		return len(self.factories)
+
+	def has_key(self, civ):
+		return civ in self.factories
+
+	def keys(self):
+		return self.factories.keys()
+
+	def get(self, civ, default=None):
+		if civ in self.factories:
+			return self[civ]
+		return default
+
+	def isBuilt(self, civ):
+		return civ in self.generators
+
+	def warm(self, civs):
+		"""
+		Builds the generators for the given civs ahead of their first use.
+		"""
+		for civ in civs:
+			if civ in self.factories:
+				self[civ]
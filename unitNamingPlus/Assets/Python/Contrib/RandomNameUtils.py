@@ -20,9 +20,13 @@ import BugData
 import BugUtil
 
 from Markov import *
+from GeneratorRegistry import GeneratorRegistry
+import RandomSource
 
 gc = CyGlobalContext()
-gRandom = gc.getASyncRand()
+gRandom = RandomSource.RANDOM
+
+GENERATORS = GeneratorRegistry()
 
 def getDataValue(key):
 	counters = BugData.getGameData().getTable("RandomNameUtils")
@@ -115,7 +119,11 @@ class AztecGenerator(Generator):
 
 		firstName = self.choice(firstNames)
 		lastName = self.choice(firstNames)
+		budget = Budget()
 		while firstName == lastName:
+			if not budget.spend():
+				countFallback(self.__class__.__name__)
+				break
 			lastName = self.choice(firstNames)
 
 		unitName = self.replaceNumeral(firstName) + " " + self.replaceNumeral(lastName)
@@ -136,7 +144,11 @@ class SimplifiedGenerator(Generator):
 
 		firstName = self.choice(firstNames)
 		lastName = self.choice(firstNames)
+		budget = Budget()
 		while firstName == lastName:
+			if not budget.spend():
+				countFallback(self.__class__.__name__)
+				break
 			lastName = self.choice(firstNames)
 
 		unitName = firstName + " " + lastName
@@ -163,13 +175,7 @@ class MarkovGenerator(Generator):
 		self.maxlen = maxlen
 
 	def generateComponent(self, mc):
-		component = ""
-		# loopcounter ensures termination
-		loopcounter = 0
-		while ((len(component) < self.minlen or len(component) > self.maxlen) and loopcounter < self.minlen):
-			component = mc.newName().title()
-			loopcounter = loopcounter + 1
-		return component
+		return mc.newNameWithin(self.minlen, self.maxlen, "", None, self.__class__.__name__).title()
 
 	def generateMarkov(self, mcf, mcm, mcl):
 		firstName = self.generateComponent(mcf)
@@ -203,7 +209,7 @@ LAST_AMERICAN = [
 	"Abelard","Ackley","Acton","Addison","Afton","Aida","Aidan","Ailen","Aland","Alcott","Alden","Alder","Aldercy","Aldis","Aldrich","Alfred","Allard","Alvin","Amaris","Amberjill","Amherst","Amsden","Ansley","Ashley","Atherol","Atwater","Atwood","Audrey","Avena","Averill","Ballard","Bancroft","Barclay","Barden","Barnett","Baron","Barse","Barton","Baul","Bavol","Baxter","Beacher","Beaman","Beardsley","Beccalynn","Bede","Beldon","Benson","Bentley","Benton","Bersh","Bethshaya","Beval","Beverly","Birch","Bishop","Blade","Blaine","Blake","Blossom","Blythe","Bob","Bolton","Bond","Booker","Booth","Borden","Bowman","Braden","Bradford","Bradley","Bramwell","Brandon","Bray","Brayden","Brenda","Brennan","Brent","Brett","Brewster","Brigham","Brinley","Brishen","Shea","Brock","Broderick","Bromley","Bronson","Brook","Brown","Buck","Buckley","Bud","Bunny","Burdette","Burgess","Burle","Burne","Burt","Burton","Calder","Caldwell","Calhoun","Calvert","Cam","Cameron","Carleton","Carling","Carlisle","Carlton","Carlyle","Carrington","Carter","Carver","Chad","Chal","Channing","Chapman","Charles","Chatwin","Chelsea","Chilton","Claiborne","Clark","Clayton","Clay","Cleveland","Clifford","Clinton","Clive","Clovis","Cody","Colby","Cole","Coleman","Collier","Colton","Columbia","Corin","Corliss","Coty","Courtland","Courtney","Creighton","Crosby","Culver","Currier","Cynric","Dale","Dallin","Dalton","Damon","Dane","Danior","Daralis","Darnell","Darrel","Darren","Darthmouth","Darwin","Dawn","Dayton","Demelza","Dempster","Denley","Denton","Denver","Derwin","Devon","Dickinson","Digby","Dixie","Donald","Dooriya","Dorset","Dory","Dover","Drake","Duane","Dudley","Dugan","Dunstan","Durriken","Durward","Dustin","Dwennon","Dwight","Eartha","Easter","Eaton","Ebony","Edda","Edgardo","Edison","Edlyn","Edmond","Edolie","Edsel","Edward","Edward","Eddie","Egerton","Elden","Eldon","Eldridge","Ella","Elmar","Elton","Ember","Emerson","Emmett","Ena","Erika","Erskine","Esmeralda","Esmond","Ewing","Fairfax","Falkner","Farley","Farrah","Farrah","Fara","Farrell","Fear","Fenton","Fern","Fielding","Finlay","Fleming","Fleta","Fletcher","Floyd","Forbes","Ford","Forrester","Free","Fuller","Fulton","Gage","Gail","Gaines","Garfield","Garrick","Garridan","Gary","Garyson","Geoffrey","Gleda","Goldie","Gordon","Granger","Grayson","Gresham","Grover","Gypsy","Gytha","Hadden","Hale","Hall","Halsey","Halton","Hamilton","Hanley","Harden","Harley","Harman","Harmony","Harold","Harper","Harrison","Hartley","Harva","Harvey","Hayden","Hayes","Haylee","Hazel","Heath","Heather","Hilton","Holbrook","Holly","Holt","Honey","Hope","Houston","Howard","Hugh","Hunter","Huntley","Ida","India","Ives","Jagger","Jal","James","Jimmy","Jamie","Jamison","Jarman","Jarvis","Jillian","Jocelyn","Joyce","Jonesy","Joy","Kaelyn","Keane","Keene","Kell","Kelsey","Kemp","Kenelm","Kenley","Kennard","Kenneth","Kenrich","Kent","Kenton","Ker","Keyon","Kim","Kimberley","King","Kingsley","Kinsey","Kipling","Kipp","Kirsten","Kismet","Knox","Kody","Kyla","Ladd","Lainey","Lander","Landon","Lane","Lang","Langley","Lari","Lark","Latimer","Lawson","Lee","Leigh","Leighton","Leland","Lensar","Leslie","Lew","Liberty","Lincoln","Lind","Lindsay","Linwood","Litton","Llewellyn","Locke","London","Love","Lowell","Luella","Lyman","Lyndon","Lyre","Mac","Macon","Macy","Maida","Maitane","Maitland","Makepeace","Mala","Mander","Manhattan","Manley","Manning","Marden","Marland","Marlow","Marsden","Marshal","Mather","Mavis","Maxwell","Mead","Melor","Melville","Mendel","Mercer","Mercy","Merrick","Merry","Milburn","Millard","Miller","Milton","Missy","Misty","Morley","Morven","Mull","Nara","Nash","Neda","Nelson","Nevin","Newell","Newman","Norman","North","Nyle","Oakes","Oakley","Ogden","Olin","Orman","Orson","Osbert","Osborn","Osmond","Oswald","Oswin","Oxford","Packard","Palma","Palmer","Paris","Parker","Parr","Parry","Paxton","Payton","Pearl","Pebbles","Pell","Penley","Penn","Pepper","Perri","Perry","Pierce","Pierson","Piper","Poppy","Prentice","Prescott","Preston","Putnam","Queen","Queena","Queenie","Quella","Quenna","Radcliff","Radcliffe","Radella","Radford","Rae","Raleigh","Ralph","Ramsey","Ransford","Ransley","Ransom","Raven","Ravinger","Rawlins","Rayburn","Raymond","Read","Redford","Reed","Reeve","Reeves","Reginald","Remington","Rhett","Rhodes","Richard","Richelle","Rider","Ridgley","Ridley","Rigby","Ripley","Rishley","Robert","Roberta","Rochester","Rodman","Rodney","Roldan","Rowan","Rowena","Royce","Rudd","Rudyard","Ruford","Rumer","Russel","Rutherford","Ryesen","Rylan","Sabrina","Brina","Salal","Sanborn","Sanders","Sandon","Sanford","Sawyer","Scarlet","Scarlett","Scott","Seabert","Seaton","Selby","Severin","Seward","Seymour","Shandy","Sharman","Shaw","Shelby","Sheldon","Shelley","Shepherd","Sherlock","Sherman","Sherwood","Shipley","Shirley","Siddel","Simmon","Skeet","Skye","Skyla","Skylar","Slade","Smith","Snowden","Spalding","Sparrow","Spencer","Spike","Spring","Standish","Stanford","Stanislaw","Stanley","Stanley","Stan","Stanway","Sterling","Sterne","Stockard","Stoke","Stokley","Storm","Stroud","Studs","Summer","Sunny","Sutton","Swain","Tab","Tanner","Tate","Tatum","Tawnie","Taylor","Telford","Tem","Tennyson","Terrel","Thane","Thatcher","Thistle","Thorne","Thorpe","Thurlow","Tilden","Tina","Todd","Tomkin","Townsend","Tranter","Tremayne","Trey","Tripp","Trudy","Truman","Tucker","Tuesday","Turner","Twain","Tye","Tyler","Tyne","Udolf","Ulla","Ulrich","Ulrika","Unity","Unwin","Upshaw","Upton","Vala","Vance","Velvet","Verity","Vian","Wade","Wakefield","Walker","Wallace","Walton","Ward","Warren","Washington","Watson","Waverly","Wayland","Waylen","Wayland","Wayne","Webster","Welcome","Wells","Wendy","Wesley","West","Weston","Wetherby","Wheaton","Wheeler","Whit","Whitfield","Whitlaw","Whitney","Wilfred","Willow","Wilmer","Wilona","Winifred","Winslow","Winston","Winter","Winthrop","Wolf","Woodley","Woodrow","Woodward","Wright","Wyatt","Wylie","Wyndam","Wyndham","Yardley","Yates","Yedda","Yeoman","York","Yule","Zane","Zelene","Zinnia","Allen","Austin","Avery","Bryant","Elmer","Emmett","Everett","Garrett","Gary","Jackson","Larkin","Lark","Lamont","Lawrence","Madison","Merle","Merrill","Mitchell","Morris","Nelson","Otis","Pierce","Stacy","Stacey","Willard","Willis","Wilson","Wyatt","Ainsley","Alton","Ashley","Bailey","Barrington","Bentley","Beverly","Bradford","Bradley","Brady","Brent","Brock","Brooke","Byron","Camden","Carlton","Chester","Clay","Clayton","Clifford","Clifton","Clinton","Clive","Colton","Dale","Dalton","Dana","Darby","Denzil","Digby","Drake","Dudley","Easton","Forrest","Glanville","Grover","Hailey","Haley","Hartley","Heath","Holden","Kelsey","Kendall","Kent","Kenton","Kimberly","Landon","Lee","Lester","Milton","Nash","Norris","Odell","Perry","Peyton","Preston","Rodney","Royston","Shelby","Sheldon","Shirley","Stanley","Stanton","Vance","Van","Wade","Wesley","Whitney","Winston","Woodrow","Roscoe","Barrie","Barry","Colby","Courtney","Courtenay","Darcy","Darrell","Darryl","Lacey","Lance","Lane","Leland","Montague","Mortimer","Morton","Neville","Percy","Sacheverell","Troy","Vernon","Warren","Blake","Brady","Brett","Cade","Chance","Cole","Curtis","Dana","Drew","Franklin","Scott","Tate","Todd","Truman","Wendell","Wynne","Bailey","Baron","Booker","Brewster","Carter","Chandler","Chauncey","Chase","Clark","Cooper","Cody","Cordell","Dexter","Earl","Garnet","Hunter","Jagger","Marshall","Mason","Millard","Page","Paige","Parker","Sherman","Tanner","Taylor","Tucker","Tyler","Travis","Spencer","Walker","Wayne","Bruce","Graham","Lyle","Grant","Ross","Wallace","Stuart","Dallas","Gordon","Kirk","Lindsay","Lindsey","Maxwell","Ramsay","Rutherford","Blair","Douglas","Keith","Kyle","Ross","Sterling","Boyd","Cameron","Cambell","Doyle","MacKenzie","McKinley","Irving","Logan","Barry","Cody","Darcy","Desmond","Grady","Kelley","Kelly","Kennedy","Sullivan","Barrington","Barry","Brady","Carroll","Casey","Cassidy","Cody","Donovan","Fallon","Hogan","Keegan","Quinn","Quillian","Sheridan","Corey","Cory","Delaney","Perry","Craig","Kendall","Trevor","Meredith","Vaughan","Wynne"
 	]
 
-GENERATOR_AMERICAN = Generator(
+GENERATORS.register("CIVILIZATION_AMERICA", Generator,
 	M_FIRST_AMERICAN,
 	F_FIRST_AMERICAN,
 	M_FIRST_AMERICAN + LAST_AMERICAN,
@@ -242,7 +248,7 @@ LAST_ARABIAN = [
 	"Ali", "Ahmed", "Ahmad", "Haddad", "Mahmood", "Mansoor", "Rahman", "Abdel", "Naser", "Hanna", "Hana", "Qasim", "Sam", "Mansour", "Hadad", "Musa", "Mahmoud", "Nasser", "Hasan", "Malik", "Awad", "Hassan", "Hasan", "Essa", "Turk", "Mousa", "Mazin", "Qasem", "Qasim", "Khaleel", "Khalil", "Khaleel", "Khalil", "Kalil", "Kaleel", "Isa", "Nasser", "Yousif", "Yousef", "Jaber", "Jabir", "Shaheen", "Abba", "Najjar", "Alam", "Salah", "Abdullah", "Abdul", "Abdulah", "Abdellah", "Saleh", "Salih", "Issa", "Aziz", "Bari", "Ababneh", "Hussain", "Hossein", "Khatib", "Mustafa", "Khoury", "Sleiman", "Sulaiman", "Sulayman", "Yaseen", "Ibrahim", "Ibraheem", "Ibrahim", "Qassem", "Abbas", "Abbas", "Hamdan", "Abolhassan", "Amin", "Ameen", "Ismail", "Salman", "Rashid", "Karim", "Saad", "Sad", "Temiz", "Hamid", "Ayasha", "Saleem", "Salim", "Shadi", "Omar", "Omer", "Ommar", "Murat", "Habib", "Shareef", "Sharif", "Mahmad", "Najeeb", "Armanjani", "Shahriar", "Rasheed", "Mohammad"
 	]
 
-GENERATOR_ARABIAN = ArabianGenerator(
+GENERATORS.register("CIVILIZATION_ARABIA", ArabianGenerator,
 	M_FIRST_ARABIAN,
 	F_FIRST_ARABIAN,
 	M_FIRST_ARABIAN,
@@ -316,7 +322,7 @@ F_AZTEC = [
  "Zaniyah", "Zeltzin", "Zuma",   "Zyanya"
 ]
 
-GENERATOR_AZTEC = AztecGenerator(
+GENERATORS.register("CIVILIZATION_AZTEC", AztecGenerator,
 	M_AZTEC,
 	F_AZTEC,
 	AZTEC_NUMERALS
@@ -505,7 +511,7 @@ F_BABYLONIAN = [
 u"Ǎ"
 ]
 
-GENERATOR_BABYLONIAN = SimplifiedGenerator(
+GENERATORS.register("CIVILIZATION_BABYLON", SimplifiedGenerator,
 	M_BABYLONIAN,
 	F_BABYLONIAN
 	)
@@ -635,7 +641,7 @@ class ByzantineGenerator(Generator):
 
 		return unitName
 
-GENERATOR_BYZANTINE = ByzantineGenerator(
+GENERATORS.register("CIVILIZATION_BYZANTIUM", ByzantineGenerator,
 	M_FIRST_BYZANTINE, F_FIRST_BYZANTINE, M_FAMILY_BYZANTINE, F_FAMILY_BYZANTINE
 	)
 
@@ -651,7 +657,7 @@ LAST_CARTHAGINIAN = [
 	"Barca", "Gisgon", "Rhodanus"
 	]
 
-GENERATOR_CARTHAGINIAN = MarkovGenerator(
+GENERATORS.register("CIVILIZATION_CARTHAGE", MarkovGenerator,
 	M_FIRST_CARTHAGINIAN,
 	F_FIRST_CARTHAGINIAN,
 	None, None,
@@ -725,7 +731,7 @@ LAST_CELTIC = [
 	"Vaughan", "Woon"
 ]
 
-GENERATOR_CELTIC = Generator(
+GENERATORS.register("CIVILIZATION_CELT", Generator,
 	M_FIRST_CELTIC,
 	F_FIRST_CELTIC,
 	M_FIRST_CELTIC + LAST_CELTIC,
@@ -810,7 +816,7 @@ class ChineseGenerator(Generator):
 
 		return unitName
 
-GENERATOR_CHINESE = ChineseGenerator(CHINESE_FAMILY, CHINESE_MALE, CHINESE_FEMALE)
+GENERATORS.register("CIVILIZATION_CHINA", ChineseGenerator, CHINESE_FAMILY, CHINESE_MALE, CHINESE_FEMALE)
 
 M_FIRST_EGYPTIAN = [
 	"Ahmose", "Amenemhab", "Amenemhet", "Amenhirkhepshef",
@@ -859,7 +865,7 @@ F_FIRST_EGYPTIAN = [
 	"Tumerisy", "Weret-Imtes"
 	]
 
-GENERATOR_EGYPTIAN = MarkovGenerator(
+GENERATORS.register("CIVILIZATION_EGYPT", MarkovGenerator,
 	M_FIRST_EGYPTIAN,
 	F_FIRST_EGYPTIAN,
 	M_FIRST_EGYPTIAN,
@@ -948,7 +954,7 @@ LAST_ENGLISH = [
 	"Whiteside", "Wilshere", "Wolfwood", "Workman", "Zeal"
 	]
 
-GENERATOR_ENGLISH = Generator(
+GENERATORS.register("CIVILIZATION_ENGLAND", Generator,
 	M_FIRST_ENGLISH,
 	F_FIRST_ENGLISH,
 	M_FIRST_ENGLISH + LAST_ENGLISH,
@@ -999,7 +1005,7 @@ F_FIRST_ETHIOPIAN = [
 	"Yeshambel", "Yodit", "Zala", "Zinash"
 	]
 
-GENERATOR_ETHIOPIAN = Generator(
+GENERATORS.register("CIVILIZATION_ETHIOPIA", Generator,
 	M_FIRST_ETHIOPIAN,
 	F_FIRST_ETHIOPIAN,
 	M_FIRST_ETHIOPIAN,
@@ -1097,7 +1103,7 @@ class FrenchGenerator(Generator):
 
 		return unitName
 
-GENERATOR_FRENCH = FrenchGenerator(
+GENERATORS.register("CIVILIZATION_FRANCE", FrenchGenerator,
 	M_FIRST_FRENCH,
 	F_FIRST_FRENCH,
 	M_FIRST_FRENCH + M_FIRST_FRENCH + F_FIRST_FRENCH,
@@ -1182,7 +1188,7 @@ LAST_DUTCH = [
 	   "de Wolff", "Xylander", "Zaal", "Zeeger", "Zondervan"
 	   ]
 
-GENERATOR_DUTCH = Generator(
+GENERATORS.register("CIVILIZATION_NETHERLANDS", Generator,
 	M_FIRST_DUTCH,
 	F_FIRST_DUTCH,
 	M_FIRST_DUTCH,
@@ -1264,7 +1270,7 @@ LAST_GERMAN = [
 		"Wolf", "Wolff", "Ziegler", "Zimmermann"
 		]
 
-GENERATOR_GERMAN = Generator(
+GENERATORS.register("CIVILIZATION_GERMANY", Generator,
 	M_FIRST_GERMAN,
 	F_FIRST_GERMAN,
 	M_FIRST_GERMAN,
@@ -1409,7 +1415,7 @@ class GreekGenerator(Generator):
 
 		return unitName
 
-GENERATOR_GREEK = GreekGenerator(
+GENERATORS.register("CIVILIZATION_GREECE", GreekGenerator,
 	M_FIRST_GREEK, F_FIRST_GREEK, M_LAST_GREEK, F_LAST_GREEK
 	)
 
@@ -1499,7 +1505,7 @@ LAST_HOLY_ROMAN = [
 	"Wichmann", "Willehad", "Willibald", "Willibrord"
 	]
 
-GENERATOR_HOLY_ROMAN = MarkovGenerator(
+GENERATORS.register("CIVILIZATION_HOLY_ROMAN", MarkovGenerator,
 	M_FIRST_HOLY_ROMAN,
 	F_FIRST_HOLY_ROMAN,
 	M_FIRST_HOLY_ROMAN,
@@ -1557,7 +1563,7 @@ F_INCA = [
 	"Waytamayu", "Yachay", "Yma", "Zaramamma", "Zincheata"
 	]
 
-GENERATOR_INCA = MarkovGenerator(
+GENERATORS.register("CIVILIZATION_INCA", MarkovGenerator,
 	M_INCA,
 	F_INCA,
 	M_INCA,
@@ -1910,7 +1916,7 @@ class IndianGenerator(Generator):
 		else:
 			return self.north.generate(pUnit, pCity, masculine)
 
-GENERATOR_INDIAN = IndianGenerator()
+GENERATORS.register("CIVILIZATION_INDIA", IndianGenerator)
 
 JAPANESE_FAMILY = [
 	"Abe", "Ando", "Aoki", "Arai", "Chiba", "Endo",
@@ -2021,7 +2027,7 @@ class GenericAsianGenerator(Generator):
 
 		return unitName
 
-GENERATOR_JAPANESE = GenericAsianGenerator(JAPANESE_FAMILY, JAPANESE_MALE_GIVEN, JAPANESE_FEMALE_GIVEN)
+GENERATORS.register("CIVILIZATION_JAPAN", GenericAsianGenerator, JAPANESE_FAMILY, JAPANESE_MALE_GIVEN, JAPANESE_FEMALE_GIVEN)
 
 KHMER_FAMILY = [
 			"Aang", "Aek", "Ang", "Aok", "Bun", "Chan", "Chap",
@@ -2097,7 +2103,7 @@ KHMER_FEMALE_GIVEN = [
 	"Vanna", "Veasna", "Veata", "Vimean"
 	]
 
-GENERATOR_KHMER = GenericAsianGenerator(KHMER_FAMILY, KHMER_MALE_GIVEN, KHMER_FEMALE_GIVEN)
+GENERATORS.register("CIVILIZATION_KHMER", GenericAsianGenerator, KHMER_FAMILY, KHMER_MALE_GIVEN, KHMER_FEMALE_GIVEN)
 
 KOREAN_FAMILY = [
 		"A", "Aan", "Ae", "Ah", "Ahn", "Ai", "An", "Ar", "Arn",
@@ -2278,7 +2284,7 @@ KOREAN_FEMALE_GIVEN = [
 	"Yumi"
 	]
 
-GENERATOR_KOREAN = GenericAsianGenerator(KOREAN_FAMILY, KOREAN_MALE_GIVEN, KOREAN_FEMALE_GIVEN)
+GENERATORS.register("CIVILIZATION_KOREA", GenericAsianGenerator, KOREAN_FAMILY, KOREAN_MALE_GIVEN, KOREAN_FEMALE_GIVEN)
 
 MALIAN_FAMILY = [
 	u"Abouta", u"Alphadi", u"Amadu", u"Amar", u"Ascofaré",
@@ -2351,7 +2357,7 @@ MALIAN_FEMALE_GIVEN = [
 	u"Tatiska", u"Touremariam", u"Wassa"
 	]
 
-GENERATOR_MALIAN = Generator(MALIAN_MALE_GIVEN, MALIAN_FEMALE_GIVEN, MALIAN_MALE_GIVEN, MALIAN_FEMALE_GIVEN, MALIAN_FAMILY)
+GENERATORS.register("CIVILIZATION_MALI", Generator, MALIAN_MALE_GIVEN, MALIAN_FEMALE_GIVEN, MALIAN_MALE_GIVEN, MALIAN_FEMALE_GIVEN, MALIAN_FAMILY)
 
 MAYAN_MALE = [
 		"Acan", "Acat", "Ah", "Ahau", "Ahpu", "Ajbit", "Ajtzak",
@@ -2385,7 +2391,7 @@ MAYAN_FEMALE = [
 	"Xquic", "Yatzil", "Yudelle", "Zac"
 	]
 
-GENERATOR_MAYAN = MarkovGenerator(MAYAN_MALE, MAYAN_FEMALE, MAYAN_MALE, MAYAN_FEMALE, MAYAN_MALE + MAYAN_FEMALE, 1, 14)
+GENERATORS.register("CIVILIZATION_MAYA", MarkovGenerator, MAYAN_MALE, MAYAN_FEMALE, MAYAN_MALE, MAYAN_FEMALE, MAYAN_MALE + MAYAN_FEMALE, 1, 14)
 
 MONGOLIAN_MALE = [
 	"Abaqa", "Abishqa", "Agwang", "Akbarjin", "Altan",
@@ -2523,7 +2529,7 @@ class MongolianGenerator(Generator):
 		else:
 			return shortName
 
-GENERATOR_MONGOLIAN = MongolianGenerator(MONGOLIAN_PATRONYMIC, MONGOLIAN_MALE, MONGOLIAN_FEMALE, MONGOLIAN_CLAN, 21, 30)
+GENERATORS.register("CIVILIZATION_MONGOL", MongolianGenerator, MONGOLIAN_PATRONYMIC, MONGOLIAN_MALE, MONGOLIAN_FEMALE, MONGOLIAN_CLAN, 21, 30)
 
 # From Personal Names Of Indians Of New Jersey, By William Nelson, 1904
 NATIVE_AMERICAN = [
@@ -2772,18 +2778,11 @@ class NativeAmericanGenerator(MarkovGenerator):
 		super(NativeAmericanGenerator, self).__init__(names, names, names, names, names, minlen, maxlen)
 
 	def generateMarkov(self, mcf, mcm, mcl):
-		firstName = ""
-
-		while (len(firstName) < self.minlen):
-			firstName = mcf.newName()
-
-		secondName = ""
-		while (len(secondName) < self.minlen):
-			secondName = mcf.newName()
-
+		firstName = mcf.newNameWithin(self.minlen, self.maxlen, "", None, self.__class__.__name__)
+		secondName = mcf.newNameWithin(self.minlen, self.maxlen, "", None, self.__class__.__name__)
 		return firstName + " " + secondName
 
-GENERATOR_NATIVE_AMERICAN = NativeAmericanGenerator(
+GENERATORS.register("CIVILIZATION_NATIVE_AMERICA", NativeAmericanGenerator,
 	NATIVE_AMERICAN,
 	4, 18
 	)
@@ -3092,7 +3091,7 @@ OTTOMAN_SURNAMES = [
 	u"Zorlu"
 	]
 
-GENERATOR_OTTOMAN = Generator(M_FIRST_OTTOMAN, F_FIRST_OTTOMAN,
+GENERATORS.register("CIVILIZATION_OTTOMAN", Generator, M_FIRST_OTTOMAN, F_FIRST_OTTOMAN,
 							  M_FIRST_OTTOMAN,
 							  F_FIRST_OTTOMAN+OTTOMAN_SURNAMES,
 							  OTTOMAN_SURNAMES)
@@ -3185,7 +3184,7 @@ PERSIAN_SURNAMES = [
 	u"Yousefi", u"Zadeh", u"Zandi"
 	]
 
-GENERATOR_PERSIAN = Generator(M_FIRST_PERSIAN, F_FIRST_PERSIAN, M_FIRST_PERSIAN, F_FIRST_PERSIAN, PERSIAN_SURNAMES)
+GENERATORS.register("CIVILIZATION_PERSIA", Generator, M_FIRST_PERSIAN, F_FIRST_PERSIAN, M_FIRST_PERSIAN, F_FIRST_PERSIAN, PERSIAN_SURNAMES)
 
 M_FIRST_PORTUGUESE = [
 	u"Aarão", u"Abel", u"Abelardo", u"Abraão", u"Adalberto", u"Adão",
@@ -3351,7 +3350,7 @@ PORTUGUESE_SURNAMES = [
 	u"Vaz", u"Vieira", u"Vila"
 	]
 
-GENERATOR_PORTUGUESE = Generator(M_FIRST_PORTUGUESE,
+GENERATORS.register("CIVILIZATION_PORTUGAL", Generator, M_FIRST_PORTUGUESE,
 								 F_FIRST_PORTUGUESE,
 								 M_FIRST_PORTUGUESE+PORTUGUESE_SURNAMES,
 								 F_FIRST_PORTUGUESE+PORTUGUESE_SURNAMES,
@@ -3575,7 +3574,7 @@ class RomanGenerator(Generator):
 			result = result + " " + cognomen
 		return result
 
-GENERATOR_ROMAN = RomanGenerator(M_ROMAN_PRAENOMEN, F_ROMAN_PRAENOMEN, ROMAN_NOMEN, M_ROMAN_COGNOMEN, F_ROMAN_COGNOMEN)
+GENERATORS.register("CIVILIZATION_ROME", RomanGenerator, M_ROMAN_PRAENOMEN, F_ROMAN_PRAENOMEN, ROMAN_NOMEN, M_ROMAN_COGNOMEN, F_ROMAN_COGNOMEN)
 
 M_FIRST_RUSSIAN = [
 	"Afanasy", "Aleksandr", "Aleksey", "Almaz", "Alyosha", "Anastas",
@@ -3739,7 +3738,7 @@ class RussianGenerator(Generator):
 			last = self.choice(self.feminineLastNames)
 		return first + " " + patronymic + " " + last
 
-GENERATOR_RUSSIAN = RussianGenerator(M_FIRST_RUSSIAN,
+GENERATORS.register("CIVILIZATION_RUSSIA", RussianGenerator, M_FIRST_RUSSIAN,
 									 F_FIRST_RUSSIAN,
 									 M_PATRONYMIC_RUSSIAN,
 									 F_PATRONYMIC_RUSSIAN,
@@ -3780,7 +3779,7 @@ class SpanishGenerator(Generator):
 		conjunction = self.choice(self.conjunctions)
 		return first + " " + prefix + paternal + conjunction + maternal
 
-GENERATOR_SPANISH = SpanishGenerator(M_FIRST_SPANISH,
+GENERATORS.register("CIVILIZATION_SPAIN", SpanishGenerator, M_FIRST_SPANISH,
 									 F_FIRST_SPANISH,
 									 LAST_SPANISH)
 
@@ -3792,7 +3791,7 @@ SUMERIAN_FEMALE = [
 	"Ahatiwaqrat", "Ahunatum", "Akkazu", "Ama-arhus", "Amasagnul", "Ashusikildigir", "Aya", "Azimua", "Baranamtarra", "Bau", "Belessunu", "Belet-seri", "Beletum", "Belit", "Bikku-lum", "Bittatum", "Daqqartum", "Ealamassi", "Enanatuma", "Enheduanna", "Ereshkigal", "Eshargamelat", "Gatumdag", "Geshtinanna", "Gula", "Habannatum", "Iltani", "Ilusha-hegal", "Inanna", "Ishtar-gamelat", "Ishtar-ibbi", "Ishtarabiat", "Kammani", "Ki", "Kishar", "Ku-aya", "Kubaba", "Lahamu", "Lamashtu", "Lilith", "Liwwir-esagil", "Ma", "Mamitu", "Manatum", "Manungal", "Nakurtum", "Nammu", "Nanaya", "Nanshe", "Negun", "Nidaba", "Nin", "Ninbanda", "Nin-dada", "Ninegal", "Ningal", "Ningikuga", "Ninhursag", "Nin-imma", "Nin-kagina", "Ninkasi", "Ninkurra", "Ninlil", "Ninmena", "Ninsar", "Ninshubur", "Ninsun", "Ninsutu", "Ninti", "Nunbarsegunu", "Nuratum", "Puabi", "Sapurtum", "Semiramis", "Shagshag", "Shala", "Shamhat", "Sharraitu", "Sharrat-sippar", "Shat-sin", "Shatu-murrim", "Shiptu", "Shub-ad", "Shulsaga", "Siduri", "Silili", "Sin-nada", "Sirara", "Siris", "Sirtir", "Summirat-ishtar", "Tabni-ishtar", "Takurtum", "Taram-uram", "Tashmet", "Tashultum", "Tiamat", "Ua-ildak", "Ummi-waqrat", "Yadidatum"
 	]
 
-GENERATOR_SUMERIAN = MarkovGenerator(SUMERIAN_MALE, SUMERIAN_FEMALE, SUMERIAN_MALE, SUMERIAN_FEMALE, SUMERIAN_MALE + SUMERIAN_FEMALE, 2, 15)
+GENERATORS.register("CIVILIZATION_SUMERIA", MarkovGenerator, SUMERIAN_MALE, SUMERIAN_FEMALE, SUMERIAN_MALE, SUMERIAN_FEMALE, SUMERIAN_MALE + SUMERIAN_FEMALE, 2, 15)
 
 M_FIRST_VIKING = [
 	u"Absalon", u"Adolph", u"Æmunðær", u"Alexander", u"Anders", u"Angantyr", u"Anton", u"Anund", u"Ari", u"Arnar", u"Arngrim", u"Arnórr", u"Asser", u"Auðunn", u"Axel", u"Baldur", u"Bengt", u"Bernt", u"Bjalfi", u"Bjarni", u"Carsten", u"Egill", u"Eilert", u"Einar", u"Eric", u"Erling", u"Eskil", u"Eugen", u"Eysteinn", u"Filip", u"Finnbogi", u"Folke", u"Fredrik", u"Gamli", u"Gissur", u"Godfred", u"Gormr", u"Grímr", u"Guðjón", u"Guðmundur", u"Gunnbjörn", u"Gustav", u"Hákon", u"Halfdanr", u"Hallbjorn", u"Hans", u"Harald", u"Hardeknud", u"Heiðrekr", u"Helgi", u"Hilding", u"Hjalmar", u"Hlöd", u"Hrøríkr", u"Hubertus", u"Ingi", u"Ingimar", u"Ísleifur", u"Ívarr", u"Johan", u"Jón", u"Karl", u"Ketill", u"Kissinger", u"Kjárr", u"Knútr", u"Kolbeinn", u"Kristófer", u"Kveldulf", u"Leifr", u"Lorens", u"Ludvig", u"Magnús", u"Maurits", u"Mikæl", u"Olaf", u"Ólafur", u"Örn ", u"Oscar", u"Páll", u"Per", u"Ring", u"Roger", u"Sigfred", u"Sigurðr", u"Sighvatr", u"Slagfiðr", u"Snorri", u"Stefan", u"Sveinn", u"Þórðr", u"Þorlákr", u"Þórr", u"Þorfinnr", u"Þorvaldr", u"Tryggvi", u"Ulf", u"Valdemar", u"Vigleik", u"Völundr"
@@ -3823,7 +3822,7 @@ class VikingGenerator(Generator):
 		else:
 			return self.generateInternal(self.feminineFirstNames, self.feminineFirstNames, self.femininePatronymic)
 
-GENERATOR_VIKING = VikingGenerator(M_FIRST_VIKING, F_FIRST_VIKING, M_VIKING_PATRONYMIC, F_VIKING_PATRONYMIC)
+GENERATORS.register("CIVILIZATION_VIKING", VikingGenerator, M_FIRST_VIKING, F_FIRST_VIKING, M_VIKING_PATRONYMIC, F_VIKING_PATRONYMIC)
 
 M_FIRST_ZULU = [
 	"Afrika", "Ayanda", "Bambatha", "Bandise", "Bantu", "Baphethuxolo", "Bhambatha", "Bhekokwakhe", "Bhekuzulu", "Bongani", "Bonginkosi", "Bulelani", "Cetshwayo", "Chinezi", "Dabede", "Dingane", "Dingiswayo", "Dinuzulu", "Fikile", "Gcaleka", "Gumede", "Hintsa", "Hlomla", "Hlumelo", "Jama", "Josta", "Kagisho", "Kefentse", "Kgalema", "Khawuta", "Khomotso", "Langa", "Mabendle", "Mageba", "Makgatho", "Malandela", "Mangosuthu", "Maphangumzana", "Mduduzi", "Menzi", "Mnguni", "Mosibudi", "Motsoko", "Mpande", "Mpilo", "Mthunzi", "Mvume", "Mxolisi", "Nakedi", "Ndaba", "Ngangayezizwe", "Ngubengcuka", "Njongonkulu", "Nkosinathi", "Ngqeno", "Ntombela", "Ntsikelelo", "Nyaniso", "Phalo", "Phathakge", "Phiwayinkosi", "Phunga", "Potlako", "Ramopolo", "Rolihlahla", "Sakumzi", "Salukaphathwa", "Sandile", "Sarili", "Sekhukhune", "Sello", "Senzangakhona", "Senzeni", "Senzo", "Seshego", "Shaka", "Shipokosa", "Sibusiso", "Sigcawu", "Sigujana", "Sipho", "Sthembiso", "Tengo", "Thabang", "Thabo", "Thamsanqa", "Themba", "Thembelani", "Thembisile", "Tshiwo", "Tozama", "Tshidiso", "Umhlangana", "Vusumzi", "Vuyisile", "Xolani", "Zulu", "Zwelini", "Zwelihini", "Zwelivelile"
@@ -3837,7 +3836,7 @@ LAST_ZULU = [
 	"Bengu", "Biko", "Bopape", "Buthelezi", "Cele", "Chijoke", "Cwaba", "Dandala", "Danke", "Dhlomo", "Dikana", "Dikgacoi", "Dinkwanyane", "Dladla", "Dlamini", "Dlathu", "Dlwati", "Dube", "Dzedze", "Hani", "Hlomuka", "Hlongwane", "Itlhabanyeng", "Khumalo", "Jabavu", "Jafta", "Jele", "Jiba", "Khaka", "Khampepe", "Khumalo", "Kota", "Kubeka", "Leballo", "Mabalane", "Mabasa", "Mabeta", "Mabuse", "Mabuza", "Machaka", "Macozoma", "Madi", "Madikizela", "Madlala", "Madonsela", "Magagula", "Mahlangu", "Mahlo", "Makeba", "Makgoba", "Makhanya", "Makhene", "Makiwane", "Maku", "Makwetla", "Malema", "Manamela", "Manana", "Mandela", "Manganyi", "Mangena", "Mangisa", "Mapaila", "Mapisa", "Marawa", "Masekela", "Mashabane", "Mashatile", "Mashigo", "Matlwa", "Matshikiza", "Mazibuko", "Mbalula", "Mbeki", "Mbete", "Mbewe", "Mchunu", "Mdlalose", "Mfeketo", "Mhlantla", "Mkhwebane", "Mkhize", "Mlambo", "Mlungisi", "Mmaka", "Mndaweni", "Mntambo", "Modiselle", "Mollo", "Monakali", "Montjane", "Moropane", "Motlanthe", "Mpupha", "Msomi", "Mthethwa", "Mukasi", "Mushwana", "Mutsi", "Mxenge", "Ndleleni", "Ndodana", "Ndungane", "Ndzundzu", "Ngalo", "Ngcobo", "Ngcuka", "Nginza", "Ngubane", "Nhleko", "Nkabinde", "Nkoana", "Nkoane", "Nqakula", "Ntloko", "Ntozakhe", "Ntwanambi", "Nxasana", "Nxesi", "Nxumalo", "Nyamza", "Nyandeni", "Nyiki", "Nzimande", "Nzo", "Phahlane", "Phango", "Phiyega", "Pholo", "Phosa", "Pikoli", "Qequ", "Qoboza", "Ramagoshi", "Ramaphosa", "Ramphele", "Rankoe", "Seakgoe", "Selebi", "Senekal", "Shabalala", "Shenxane", "Sibande", "Sibeko", "Sibisi", "Simelane", "Sisulu", "Situ", "Thabethe", "Thipe", "Tlali", "Tshiqi", "Tsotsobe", "Tutu", "Veleko", "Yende", "Zokwana", "Zuma"
 	]
 
-GENERATOR_ZULU = Generator(M_FIRST_ZULU, F_FIRST_ZULU, M_FIRST_ZULU, F_FIRST_ZULU, LAST_ZULU)
+GENERATORS.register("CIVILIZATION_ZULU", Generator, M_FIRST_ZULU, F_FIRST_ZULU, M_FIRST_ZULU, F_FIRST_ZULU, LAST_ZULU)
 
 class BarbarianGenerator(Generator):
 
@@ -3849,45 +3848,7 @@ class BarbarianGenerator(Generator):
 		delegate = GENERATORS[civ]
 		return delegate.generate(pUnit, pCity, masculine)
 
-GENERATOR_BARBARIAN = BarbarianGenerator()
-
-GENERATORS = {
-	"CIVILIZATION_AMERICA": GENERATOR_AMERICAN,
-	"CIVILIZATION_ARABIA": GENERATOR_ARABIAN,
-	"CIVILIZATION_AZTEC": GENERATOR_AZTEC,
-	"CIVILIZATION_BABYLON": GENERATOR_BABYLONIAN,
-	"CIVILIZATION_BYZANTIUM": GENERATOR_BYZANTINE,
-	"CIVILIZATION_CARTHAGE": GENERATOR_CARTHAGINIAN,
-	"CIVILIZATION_CELT":  GENERATOR_CELTIC,
-	"CIVILIZATION_CHINA": GENERATOR_CHINESE,
-	"CIVILIZATION_EGYPT": GENERATOR_EGYPTIAN,
-	"CIVILIZATION_ENGLAND": GENERATOR_ENGLISH,
-	"CIVILIZATION_ETHIOPIA" : GENERATOR_ETHIOPIAN,
-	"CIVILIZATION_FRANCE": GENERATOR_FRENCH,
-	"CIVILIZATION_GERMANY": GENERATOR_GERMAN,
-	"CIVILIZATION_GREECE": GENERATOR_GREEK,
-	"CIVILIZATION_HOLY_ROMAN": GENERATOR_HOLY_ROMAN,
-	"CIVILIZATION_INCA": GENERATOR_INCA,
-	"CIVILIZATION_INDIA": GENERATOR_INDIAN,
-	"CIVILIZATION_JAPAN": GENERATOR_JAPANESE,
-	"CIVILIZATION_KHMER": GENERATOR_KHMER,
-	"CIVILIZATION_KOREA": GENERATOR_KOREAN,
-	"CIVILIZATION_MALI": GENERATOR_MALIAN,
-	"CIVILIZATION_MAYA": GENERATOR_MAYAN,
-	"CIVILIZATION_MONGOL": GENERATOR_MONGOLIAN,
-	"CIVILIZATION_NATIVE_AMERICA": GENERATOR_NATIVE_AMERICAN,
-	"CIVILIZATION_NETHERLANDS": GENERATOR_DUTCH,
-	"CIVILIZATION_OTTOMAN": GENERATOR_OTTOMAN,
-	"CIVILIZATION_PERSIA": GENERATOR_PERSIAN,
-	"CIVILIZATION_PORTUGAL": GENERATOR_PORTUGUESE,
-	"CIVILIZATION_ROME": GENERATOR_ROMAN,
-	"CIVILIZATION_RUSSIA": GENERATOR_RUSSIAN,
-	"CIVILIZATION_SPAIN": GENERATOR_SPANISH,
-	"CIVILIZATION_SUMERIA": GENERATOR_SUMERIAN,
-	"CIVILIZATION_VIKING": GENERATOR_VIKING,
-	"CIVILIZATION_ZULU": GENERATOR_ZULU,
-	"CIVILIZATION_BARBARIAN": GENERATOR_BARBARIAN
-	}
+GENERATORS.register("CIVILIZATION_BARBARIAN", BarbarianGenerator)
 
 # Lists of names have been generated using
 # NameMage
@@ -4132,7 +4093,7 @@ def generateCivilizationName(iCivilizationType):
 	strPre = ""
 	strMid = ""
 	strEnd = ""
-	random = gc.getASyncRand()
+	random = gRandom
 
 	if(len(civilizationNameHash[strCivilizationType]["PRE"]) > 0):
 		strPre = civilizationNameHash[strCivilizationType]["PRE"][random.get(len(civilizationNameHash[strCivilizationType]["PRE"]), "Random Name")]
@@ -4152,7 +4113,7 @@ def generateCivilizationName(iCivilizationType):
 def getRandomName():
 
 	unitName = ""
-	random = gc.getASyncRand()
+	random = gRandom
 
 	firstName = firstNameList[random.get(len(firstNameList), "Random Name")]
 	lastName = lastNamesList[random.get(len(lastNamesList), "Random Name")]
@@ -4181,4 +4142,16 @@ def getRandomCiv():
 	return list[gRandom.get(len(list), "getRandomCiv")]
 
 def getHiddenNationalityName(pUnit, pCity, bMasculine):
-	return GENERATOR_BARBARIAN.generate(pUnit, pCity, bMasculine)
\ No newline at end of file
+	return GENERATORS["CIVILIZATION_BARBARIAN"].generate(pUnit, pCity, bMasculine)
+
+def warm():
+	"""
+	Builds the generators for the civs in the current game.
+	"""
+	civs = []
+	for iPlayer in range(gc.getMAX_CIV_PLAYERS()):
+		player = gc.getPlayer(iPlayer)
+		if player.isEverAlive():
+			civs.append(gc.getCivilizationInfo(player.getCivilizationType()).getType())
+	GENERATORS.warm(civs)
+	MARKOV_CACHE.save()
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Opt-in profiling of the time and objects it takes to load the name generators
+# By: duckstab (James Conrad Shea)
+#
+# Off unless a file named StartupProfile.on is next to this module (or
+# enable() is called). When on, install() times every module imported from
+# then on, build() times each generator as it is constructed, and report()
+# writes what was recorded to the BUG log.
+###############################################################################
+
+import __builtin__
+import gc
+import os
+import sys
+from timeit import default_timer
+
+try:
+	ENABLED = os.path.exists(os.path.join(os.path.dirname(__file__), "StartupProfile.on"))
+except NameError:
+	ENABLED = False
+# entries that took less time than this are left out of the report
+REPORT_THRESHOLD = 0.001
+
+class Entry:
+	"""
+	One module import or generator construction. seconds and objects
+	include everything done inside it; own is the time not spent in nested
+	entries. objects is the change in the number of objects tracked by the
+	garbage collector.
+	"""
+
+	def __init__(self, kind, name, depth):
+		self.kind = kind
+		self.name = name
+		self.depth = depth
+		self.seconds = 0.0
+		self.own = 0.0
+		self.objects = 0
+		# time spent in nested entries, including measuring them
+		self.nested = 0.0
+
+class Profile:
+
+	def __init__(self):
+		self.entries = []
+		self.stack = []
+		self.importer = None
+
+	def measure(self, kind, name, function, args, kwargs={}):
+		"""
+		Calls function(*args, **kwargs) and records its time and objects.
+		"""
+		outer = default_timer()
+		entry = Entry(kind, name, len(self.stack))
+		self.entries.append(entry)
+		self.stack.append(entry)
+		objects = len(gc.get_objects())
+		start = default_timer()
+		try:
+			return function(*args, **kwargs)
+		finally:
+			end = default_timer()
+			entry.seconds = end - start
+			entry.own = entry.seconds - entry.nested
+			entry.objects = len(gc.get_objects()) - objects
+			self.stack.pop()
+			if self.stack:
+				self.stack[-1].nested += default_timer() - outer
+
+	def install(self):
+		"""
+		Replaces __import__ with one that measures imports of new modules.
+		"""
+		if self.importer is not None:
+			return
+		self.importer = __builtin__.__import__
+		importer = self.importer
+		def profiledImport(name, *args, **kwargs):
+			if name in sys.modules:
+				return importer(name, *args, **kwargs)
+			return self.measure("import", name, importer, (name,) + args, kwargs)
+		__builtin__.__import__ = profiledImport
+
+	def uninstall(self):
+		if self.importer is not None:
+			__builtin__.__import__ = self.importer
+			self.importer = None
+
+	def lines(self, threshold=REPORT_THRESHOLD):
+		"""
+		The report on the entries recorded so far, as lines of text.
+		"""
+		result = ["StartupProfile: %8s %8s %8s  %s" % ("ms", "own ms", "objects", "import/generator")]
+		total = 0.0
+		for entry in self.entries:
+			if entry.depth == 0:
+				total += entry.seconds
+			if entry.seconds < threshold:
+				continue
+			result.append("StartupProfile: %8.1f %8.1f %8d  %s%s %s" % (
+				entry.seconds * 1000, entry.own * 1000, entry.objects,
+				"  " * entry.depth, entry.kind, entry.name))
+		ranked = [(entry.own, entry.kind, entry.name) for entry in self.entries]
+		ranked.sort()
+		ranked.reverse()
+		result.append("StartupProfile: %.1f ms in all; most own time: %s" % (total * 1000,
+			", ".join(["%s %s %.1f ms" % (kind, name, own * 1000) for (own, kind, name) in ranked[:5]])))
+		return result
+
+	def report(self, write=None):
+		"""
+		Writes the entries recorded since the last report and forgets them.
+		"""
+		if not self.entries:
+			return
+		if write is None:
+			import BugUtil
+			write = BugUtil.info
+		for line in self.lines():
+			write(line)
+		self.entries = []
+
+PROFILE = Profile()
+
+def enable():
+	global ENABLED
+	ENABLED = True
+
+def install():
+	"""
+	Starts timing imports if profiling is on.
+	"""
+	if ENABLED:
+		PROFILE.install()
+
+def build(name, factory, args):
+	"""
+	Returns factory(*args), timed if profiling is on.
+	"""
+	if not ENABLED:
+		return factory(*args)
+	return PROFILE.measure("generator", name, factory, args)
+
+def report(write=None):
+	"""
+	Writes what was recorded to the BUG log (or with write) if profiling is on.
+	"""
+	if ENABLED:
+		PROFILE.report(write)
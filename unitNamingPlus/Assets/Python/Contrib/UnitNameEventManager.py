@@ -74,14 +74,18 @@ import PyHelpers
 import BugCore
 import PlayerUtil
 import Roman
+import StartupProfile
+StartupProfile.install()
 import RandomNameUtils
 import NavalUnitNaming
 import random
+import re
 import Popup as PyPopup
 import BugData
 
 
 SD_MOD_ID = "UnitCnt"
+SD_COUNTERS_ID = "UnitCounters"
 RENAME_EVENT_ID = CvUtil.getNewEventID("UnitNaming.Rename")
 
 gc = CyGlobalContext()
@@ -97,6 +101,155 @@ greek_array = ['Alpha', 'Beta', 'Gamma', 'Delta', 'Epsilon', 'Zeta', 'Eta', 'The
 
 ordinal_array = 'th st nd rd th th th th th th'.split()
 
+# the codes of a naming convention, numbered in the order getUnitName substitutes them
+(CODE_RD, CODE_RC, CODE_CT, CODE_CV, CODE_UT, CODE_CB, CODE_DM, CODE_LD, CODE_CNT, CODE_TT1, CODE_TT2) = range(11)
+FIXED_CODES = (("^rd^", CODE_RD), ("^rc^", CODE_RC), ("^ct^", CODE_CT), ("^cv^", CODE_CV),
+			   ("^ut^", CODE_UT), ("^cb^", CODE_CB), ("^dm^", CODE_DM), ("^ld^", CODE_LD))
+COUNT_CODES = (("^cnt", CODE_CNT), ("^tt1", CODE_TT1), ("^tt2", CODE_TT2))
+# codes the original substitution loop always filled in, needed by conventions that are not compiled
+CONTEXT_CODES = (CODE_CT, CODE_CV, CODE_UT, CODE_CB, CODE_DM, CODE_LD)
+# codes whose values each counter is kept separately for
+COUNTER_CODES = {
+	"UNIT": (CODE_UT,),
+	"COMBAT": (CODE_CB,),
+	"CITY": (CODE_CT,),
+	"UNITCITY": (CODE_UT, CODE_CT),
+	"DOMAIN": (CODE_DM,),
+}
+# characters that stand in for each code while a convention is compiled
+MARKERS = [chr(0x10 + i) for i in range(11)]
+MARKER_CODES = dict([(MARKERS[i], i) for i in range(11)])
+# characters in a substituted name that the counting code parser could trip over
+COUNT_SYNTAX = re.compile(r"[\^\[\]:]")
+
+class UnitNameTemplate:
+	"""
+	A naming convention compiled into a format string with a %s for each
+	code, the codes in the order they fill it, and the counter the
+	convention uses, if any.
+
+	Conventions with ^civ4^ only set civ4. Conventions with ^nav^ or more
+	than one counter are not compiled and go through the original
+	substitution loop. needs lists the codes whose values a compiled
+	convention reads, so only those are looked up.
+	"""
+
+	def __init__(self, conv):
+		self.conv = conv
+		self.civ4 = False
+		self.compiled = False
+		self.uses = [False] * len(MARKERS)
+		self.format = ""
+		self.codes = ()
+		self.needs = ()
+		self.counter = None
+		self.total1 = None
+		self.total2 = -1
+		# (code, code text, number format) of the counting codes found
+		self.counts = []
+
+# compiled templates by naming convention
+TEMPLATES = {}
+# naming conventions by (era, unit class, combat type), cleared at the start
+# of every game and turn so that changed UnitNaming options are picked up
+CONVENTIONS = {}
+# unit class types by unit class
+UNIT_CLASS_TYPES = {}
+
+def clearConventions():
+	CONVENTIONS.clear()
+
+def getUnitClassType(iUnitClass):
+	try:
+		return UNIT_CLASS_TYPES[iUnitClass]
+	except KeyError:
+		zsUnitClass = gc.getUnitClassInfo(iUnitClass).getType()
+		UNIT_CLASS_TYPES[iUnitClass] = zsUnitClass
+		return zsUnitClass
+
+class UnitCounters(object):
+	"""
+	Write-behind store of the unit counters.
+
+	Each counter is a (cnt, tt1, tt2) tuple keyed by a tuple of what it
+	counts across, such as ("UNITCITY", unit, city). They are read from
+	BugData as one dict the first time a counter is needed, and written
+	back by flush() before the game is saved. Counters saved by older
+	versions, one SD_MOD_ID table each keyed by the joined tuple, are read
+	the first time their key comes up and their tables deleted by the next
+	flush().
+	"""
+
+	def __init__(self):
+		self.clear()
+
+	def clear(self):
+		self.counters = None
+		self.dirty = False
+		# keys of the SD_MOD_ID tables read since the last flush
+		self.migrated = []
+
+	def getCounters(self):
+		if self.counters is None:
+			table = BugData.getGameData().getTable(SD_COUNTERS_ID)
+			if table.hasTable("counters"):
+				self.counters = dict(table.getTable("counters")["val"])
+			else:
+				self.counters = {}
+		return self.counters
+
+	def get(self, key):
+		"""
+		The counter's (cnt, tt1, tt2), or None if it has not been started.
+		"""
+		counters = self.getCounters()
+		try:
+			return counters[key]
+		except KeyError:
+			counter = self.getLegacy(key)
+			counters[key] = counter
+			return counter
+
+	def getLegacy(self, key):
+		legacy = BugData.getGameData().getTable(SD_MOD_ID)
+		zsSDKey = "".join(key)
+		if not legacy.hasTable(zsSDKey):
+			return None
+		self.migrated.append(zsSDKey)
+		self.dirty = True
+		table = legacy.getTable(zsSDKey)
+		try:
+			counter = (table["cnt"], table["tt1"], table["tt2"])
+		except KeyError:
+			return None
+		if counter[0] is None:
+			return None
+		return counter
+
+	def set(self, key, counter):
+		self.getCounters()[key] = counter
+		self.dirty = True
+
+	def flush(self):
+		if not self.dirty:
+			return
+		counters = {}
+		for (key, counter) in self.counters.items():
+			if counter is not None:
+				counters[key] = counter
+		BugUtil.debug("UnitCounters: writing %d counters" % len(counters))
+		BugData.getGameData().getTable(SD_COUNTERS_ID).getTable("counters")["val"] = counters
+		if self.migrated:
+			legacy = BugData.getGameData().getTable(SD_MOD_ID)
+			for zsSDKey in self.migrated:
+				legacy.delTable(zsSDKey)
+			BugUtil.debug("UnitCounters: deleted %d old counter tables" % len(self.migrated))
+			self.migrated = []
+		self.dirty = False
+		BugData.save()
+
+COUNTERS = UnitCounters()
+
 #def BUGPrint (stuff):
 #   stuff = "UNEvMg: " + stuff
 #   print stuff
@@ -153,6 +306,7 @@ class UnitNameEventManager:
 		pUnit = pPlayer.getUnit(0)
 		pCity = pPlayer.getCity(0)
 		lUnitReName = UnitReName()
+		clearConventions()
 
 		zsEra = gc.getEraInfo(pPlayer.getCurrentEra()).getType()
 		zsUnitCombat = lUnitReName.getUnitCombat(pUnit)
@@ -166,7 +320,7 @@ class UnitNameEventManager:
 		zsUnitNameConv = popupReturn.getEditBoxString(0)
 		self.UnitNameConv = zsUnitNameConv
 
-		zsUnitName = lUnitReName.getUnitName(zsUnitNameConv, pUnit, pCity, popupReturn.getButtonClicked() == 1)
+		zsUnitName = lUnitReName.getUnitName(zsUnitNameConv, pUnit, pCity, popupReturn.getButtonClicked() == 1, True)
 
 		self.Prompt = "Using the convention\n   '%s'\ngenerated the unit name\n   '%s'\n\nEnter another rename convention" % (zsUnitNameConv, zsUnitName)
 
@@ -192,10 +346,32 @@ class BuildUnitName(AbstractBuildUnitName):
 		eventManager.addEventHandler("unitFeminized", self.onUnitFeminized)
 		eventManager.addEventHandler("cityBuilt", self.onCityBuilt)
 		eventManager.addEventHandler("goodyReceived", self.onGoodyReceived)
+		eventManager.addEventHandler("GameStart", self.onGameStart)
+		eventManager.addEventHandler("OnLoad", self.onLoadGame)
+		eventManager.addEventHandler("BeginGameTurn", self.onBeginGameTurn)
+		eventManager.addEventHandler("OnPreSave", self.onPreSave)
 
 		self.eventMgr = eventManager
 		self.config = None
 
+	def onGameStart(self, argsList):
+		clearConventions()
+		COUNTERS.clear()
+		RandomNameUtils.warm()
+		StartupProfile.report()
+
+	def onLoadGame(self, argsList):
+		clearConventions()
+		COUNTERS.clear()
+		RandomNameUtils.warm()
+		StartupProfile.report()
+
+	def onBeginGameTurn(self, argsList):
+		clearConventions()
+
+	def onPreSave(self, argsList):
+		COUNTERS.flush()
+
 	def onKbdEvent(self, argsList):
 		eventType,key,mx,my,px,py = argsList
 		if ( eventType == self.eventMgr.EventKeyDown ):
@@ -247,22 +423,16 @@ class BuildUnitName(AbstractBuildUnitName):
 
 		#BUGPrint("onUnitBuild-C")
 
-		zsEra = gc.getEraInfo(pPlayer.getCurrentEra()).getType()
-		zsUnitCombat = lUnitReName.getUnitCombat(pUnit)
-		zsUnitClass = gc.getUnitClassInfo(pUnit.getUnitClassType()).getType()
+		zsUnitClass = getUnitClassType(pUnit.getUnitClassType())
 
-		BugUtil.debug("zsEra: %s", zsEra)
+		BugUtil.debug("iEra: %d", pPlayer.getCurrentEra())
 		BugUtil.debug("zsUnitClass: %s", zsUnitClass)
 
 		if zsUnitClass == "UNITCLASS_SPY":
 			iIndustrial = CvUtil.findInfoTypeNum(gc.getEraInfo, gc.getNumEraInfos(), 'ERA_INDUSTRIAL')
 			bMasculine = (pPlayer.getCurrentEra() < iIndustrial)
 
-		#BUGPrint("ERA(%s)" % (zsEra))
-		#BUGPrint("Combat(%s)" % (zsUnitCombat))
-		#BUGPrint("Class(%s)" % (zsUnitClass))
-
-		zsUnitNameConv = lUnitReName.getUnitNameConvFromIniFile(zsEra, zsUnitClass, zsUnitCombat)
+		zsUnitNameConv = lUnitReName.getUnitNameConv(pPlayer, pUnit)
 		zsUnitName = lUnitReName.getUnitName(zsUnitNameConv, pUnit, pCity, True, bMasculine)
 
 		#BUGPrint("onUnitBuild-D")
@@ -285,16 +455,11 @@ class BuildUnitName(AbstractBuildUnitName):
 		and pCity.getOwner() == PlayerUtil.getActivePlayerID()
 		and UnitNamingOpt.isEnabled()):
 			return
-		lUnitReName = UnitReName()
-		zsEra = gc.getEraInfo(pPlayer.getCurrentEra()).getType()
+		lUnits = []
 		for pUnit in PlayerUtil.playerUnits(pPlayer):
 			if pUnit.getNameNoDesc() == "":
-				zsUnitCombat = lUnitReName.getUnitCombat(pUnit)
-				zsUnitClass = gc.getUnitClassInfo(pUnit.getUnitClassType()).getType()
-				zsUnitNameConv = lUnitReName.getUnitNameConvFromIniFile(zsEra, zsUnitClass, zsUnitCombat)
-				zsUnitName = lUnitReName.getUnitName(zsUnitNameConv, pUnit, pCity, True, True)
-				if zsUnitName:
-					pUnit.setName(zsUnitName)
+				lUnits.append(pUnit)
+		setUnitNames(lUnits, UnitReName().getUnitNames(pPlayer, lUnits, pCity, True))
 
 	def onGoodyReceived(self, argsList):
 		"""
@@ -319,138 +484,271 @@ class BuildUnitName(AbstractBuildUnitName):
 						def getY(self):
 							return self.y
 					pCity = EmpireAsCity(pPlayer.getCivilizationAdjective(0), pPlot.getX(), pPlot.getY())
-				lUnitReName = UnitReName()
-				zsEra = gc.getEraInfo(pPlayer.getCurrentEra()).getType()
+				lUnits = []
 				for i in range(pPlot.getNumUnits()):
 					pUnit = pPlot.getUnit(i)
 					if pUnit and not pUnit.isNone() and pUnit.getOwner() == iPlayer:
 						if pUnit.getNameNoDesc() == "":
-							zsUnitCombat = lUnitReName.getUnitCombat(pUnit)
-							zsUnitClass = gc.getUnitClassInfo(pUnit.getUnitClassType()).getType()
-							zsUnitNameConv = lUnitReName.getUnitNameConvFromIniFile(zsEra, zsUnitClass, zsUnitCombat)
-							zsUnitName = lUnitReName.getUnitName(zsUnitNameConv, pUnit, pCity, True, True)
-							if zsUnitName:
-								pUnit.setName(zsUnitName)
+							lUnits.append(pUnit)
+				setUnitNames(lUnits, UnitReName().getUnitNames(pPlayer, lUnits, pCity, True))
 
 
+def setUnitNames(lUnits, lNames):
+	"""
+	Gives each unit its name, leaving those whose name is empty alone.
+	"""
+	for i in range(len(lUnits)):
+		if lNames[i]:
+			lUnits[i].setName(lNames[i])
+
 
 class UnitReName(object):
 
 	def getUnitName(self, sUnitNameConv, pUnit, pCity, bIncrementCounter, bMasculine):
-		BugUtil.info("getUnitName()")
+		pPlayer = gc.getPlayer(pUnit.getOwner())
+		if BugUtil.shouldLog(BugUtil.INFO):
+			self.logContext(pPlayer, pUnit, pCity)
 
-		iPlayer = pUnit.getOwner()
-		pPlayer = gc.getPlayer(iPlayer)
-
-		zsCiv = pPlayer.getCivilizationAdjective(0)
-		zsLeader = pPlayer.getName()
-		zsUnitCombat = self.getUnitCombat(pUnit)
-		zsUnitDomain = BugUtil.getPlainText("TXT_KEY_BUG_UNIT_NAMING_" + gc.getDomainInfo(pUnit.getDomainType()).getType())
-		pInfo = PyInfo.UnitInfo(pUnit.getUnitType())
-		zsUnit = pInfo.getDescription()
-		zsCity = pCity.getName()
-
-		zsEra = gc.getEraInfo(pPlayer.getCurrentEra()).getType()
-		zsUnitClass = gc.getUnitClassInfo(pUnit.getUnitClassType()).getType()
-
-		BugUtil.info("Civ(%s)" % (zsCiv))
-		BugUtil.info("Leader(%s)" % (zsLeader))
-		BugUtil.info("Combat(%s)" % (zsUnitCombat))
-		BugUtil.info("Domain(%s)" % (zsUnitDomain))
-		BugUtil.info("Unit(%s)" % (zsUnit))
-		BugUtil.info("City(%s)" % (zsCity))
-		BugUtil.info("Era(%s)" % (zsEra))
-		BugUtil.info("UnitClass(%s)" % (zsUnitClass))
-
-		zsName = sUnitNameConv
-
-		#if zsName == "":
-		#zsName = "^ut^ ^cnt[r]^ Div ^tt1[s][5:7]^ : ^ct^ ^tt2[o][101]^"
-
-		#BUGPrint("UnitNameEM-A [" + zsName + "]")
+		template = self.getTemplate(sUnitNameConv)
 
 ##  - ^civ4^ - no naming convention, uses standard civ4
 #       check if Civ4 naming convention is required
-		if not (zsName.find("^civ4^") == -1):
+		if template.civ4:
 			return ""
 
 ##  - ^rd^ - random name
-#       check if random naming convention is required
-		if not (zsName.find("^rd^") == -1):
-			zsRandomName = RandomNameUtils.getRandomName()
-			zsName = zsName.replace("^rd^", zsRandomName)
-
-
-		#BUGPrint("UnitNameEM-B")
-
 ##  - ^rc^ - random civ related name
-#       check if random civ related naming convention is required
-		if not (zsName.find("^rc^") == -1):
-			if bMasculine:
-				zsRandomName = RandomNameUtils.getRandomCivilizationName(pPlayer.getCivilizationType(), pUnit, pCity)
-			else:
-				zsRandomName = RandomNameUtils.getRandomCivilizationFemaleName(pPlayer.getCivilizationType(), pUnit, pCity)
-			zsName = zsName.replace("^rc^", zsRandomName)
-
-		#BUGPrint("UnitNameEM-C [" + zsName + "]")
-
 ##  - ^ct^ - City
 ##  - ^cv^ - Civilization
 ##  - ^ut^ - unit (eg Archer)
 ##  - ^cb^ - combat type (Melee)
 ##  - ^dm^ - domain (Water)
 ##  - ^ld^ - leader
+		values = [None] * len(MARKERS)
+		if template.compiled:
+			self.resolve(values, template.needs, pPlayer, pUnit, pCity, bMasculine)
+			if self.isSafe(template, values):
+				return self.render(template, values, bIncrementCounter)
+
+		codes = [iCode for iCode in (CODE_RD, CODE_RC) if template.uses[iCode]]
+		self.resolve(values, codes + list(CONTEXT_CODES), pPlayer, pUnit, pCity, bMasculine)
+		return self.substitute(sUnitNameConv, values, pPlayer, pUnit, pCity, bIncrementCounter)
+
+	def getUnitNames(self, pPlayer, lUnits, pCity, bMasculine):
+		"""
+		Returns the names of pPlayer's units, in order, as if getUnitName had
+		been called for each with its convention, counting them.
+
+		Each unit type's convention, template and context are looked up
+		once. The units are then named in order, so counters shared between
+		types are stepped just as they would be one unit at a time.
+		"""
+		# (convention, template, values) by unit type; values is None if the
+		# type's names need getUnitName, for random names or unsafe values
+		types = {}
+		lNames = []
+		for pUnit in lUnits:
+			iUnitType = pUnit.getUnitType()
+			entry = types.get(iUnitType)
+			if entry is None:
+				entry = self.prepareUnitType(pPlayer, pUnit, pCity, bMasculine)
+				types[iUnitType] = entry
+			(zsUnitNameConv, template, values) = entry
+			if template.civ4:
+				lNames.append("")
+			elif values is None:
+				lNames.append(self.getUnitName(zsUnitNameConv, pUnit, pCity, True, bMasculine))
+			else:
+				lNames.append(self.render(template, list(values), True))
+		return lNames
+
+	def prepareUnitType(self, pPlayer, pUnit, pCity, bMasculine):
+		"""
+		The convention and template of pUnit's type for getUnitNames, and
+		the values shared by all its units if they can be rendered directly.
+		"""
+		zsUnitNameConv = self.getUnitNameConv(pPlayer, pUnit)
+		template = self.getTemplate(zsUnitNameConv)
+		if (template.civ4
+		or not template.compiled
+		or template.uses[CODE_RD]
+		or template.uses[CODE_RC]):
+			return (zsUnitNameConv, template, None)
+		if BugUtil.shouldLog(BugUtil.INFO):
+			self.logContext(pPlayer, pUnit, pCity)
+		values = [None] * len(MARKERS)
+		self.resolve(values, template.needs, pPlayer, pUnit, pCity, bMasculine)
+		if not self.isSafe(template, values):
+			return (zsUnitNameConv, template, None)
+		return (zsUnitNameConv, template, values)
+
+	def logContext(self, pPlayer, pUnit, pCity):
+		BugUtil.info("getUnitName()")
+		BugUtil.info("Civ(%s)" % (pPlayer.getCivilizationAdjective(0)))
+		BugUtil.info("Leader(%s)" % (pPlayer.getName()))
+		BugUtil.info("Combat(%s)" % (self.getUnitCombat(pUnit)))
+		BugUtil.info("Domain(%s)" % (self.getValue(CODE_DM, pPlayer, pUnit, pCity, True)))
+		BugUtil.info("Unit(%s)" % (self.getValue(CODE_UT, pPlayer, pUnit, pCity, True)))
+		BugUtil.info("City(%s)" % (pCity.getName()))
+		BugUtil.info("Era(%s)" % (gc.getEraInfo(pPlayer.getCurrentEra()).getType()))
+		BugUtil.info("UnitClass(%s)" % (gc.getUnitClassInfo(pUnit.getUnitClassType()).getType()))
+
+	def resolve(self, values, codes, pPlayer, pUnit, pCity, bMasculine):
+		"""
+		Looks up the values of the given codes that are not known yet.
+		"""
+		for iCode in codes:
+			if values[iCode] is None:
+				values[iCode] = self.getValue(iCode, pPlayer, pUnit, pCity, bMasculine)
+
+	def getValue(self, iCode, pPlayer, pUnit, pCity, bMasculine):
+		if iCode == CODE_RD:
+			return RandomNameUtils.getRandomName()
+		elif iCode == CODE_RC:
+			if bMasculine:
+				return RandomNameUtils.getRandomCivilizationName(pPlayer.getCivilizationType(), pUnit, pCity)
+			return RandomNameUtils.getRandomCivilizationFemaleName(pPlayer.getCivilizationType(), pUnit, pCity)
+		elif iCode == CODE_CT:
+			return pCity.getName()
+		elif iCode == CODE_CV:
+			return pPlayer.getCivilizationAdjective(0)
+		elif iCode == CODE_UT:
+			return PyInfo.UnitInfo(pUnit.getUnitType()).getDescription()
+		elif iCode == CODE_CB:
+			return self.getUnitCombat(pUnit)
+		elif iCode == CODE_DM:
+			return BugUtil.getPlainText("TXT_KEY_BUG_UNIT_NAMING_" + gc.getDomainInfo(pUnit.getDomainType()).getType())
+		elif iCode == CODE_LD:
+			return pPlayer.getName()
+		return None
+
+	def getTemplate(self, conv):
+		template = TEMPLATES.get(conv)
+		if template is None:
+			template = self.compileTemplate(conv)
+			TEMPLATES[conv] = template
+		return template
+
+	def compileTemplate(self, conv):
+		"""
+		Runs the substitutions of getUnitName on the convention once, with
+		MARKERS in place of the names and numbers, and keeps the result.
+		"""
+		template = UnitNameTemplate(conv)
+		if conv.find("^civ4^") != -1:
+			template.civ4 = True
+			return template
+
+		zsName = conv
+		for (zsCode, iCode) in FIXED_CODES:
+			if zsName.find(zsCode) != -1:
+				template.uses[iCode] = True
+				zsName = zsName.replace(zsCode, MARKERS[iCode])
+
+		for zsMarker in MARKERS:
+			if conv.find(zsMarker) != -1:
+				return template
+		if zsName.find("^nav") != -1:
+			return template
+
+		if zsName.find("^cnt") != -1:
+			try:
+				template.counter = self.getCounter(zsName)
+				template.total1 = self.parseTotal1(zsName)
+				template.total2 = self.getTotal2(zsName)
+			except ValueError:
+				return template
+			for (zsCode, iCode) in COUNT_CODES:
+				zsCntCode = self.getCountCode(zsName, zsCode)
+				if zsCntCode != "":
+					template.counts.append((iCode, zsCntCode, self.getNumberFormat(zsName, zsCode)))
+					zsName = zsName.replace(zsCntCode, MARKERS[iCode])
+#           a second counter depends on what the first one left behind
+			if zsName.find("^cnt") != -1:
+				return template
+
+		parts = []
+		codes = []
+		iStart = 0
+		for i in range(len(zsName)):
+			iCode = MARKER_CODES.get(zsName[i])
+			if iCode is not None:
+				parts.append(zsName[iStart:i].replace("%", "%%"))
+				parts.append("%s")
+				codes.append(iCode)
+				iStart = i + 1
+		parts.append(zsName[iStart:].replace("%", "%%"))
+		template.format = "".join(parts)
+		template.codes = tuple(codes)
+		needs = [iCode for iCode in range(CODE_CNT) if template.uses[iCode]]
+		if template.counter is not None:
+			for iCode in COUNTER_CODES.get(template.counter, ()):
+				if iCode not in needs:
+					needs.append(iCode)
+			needs.sort()
+		template.needs = tuple(needs)
+		template.compiled = True
+		return template
+
+	def isSafe(self, template, values):
+		"""
+		False if a name could have changed how the original loop parsed the
+		counting codes around it.
+		"""
+		if template.counter is None:
+			return True
+		for iCode in template.codes:
+			if iCode < CODE_CNT and COUNT_SYNTAX.search(values[iCode]):
+				return False
+		return True
+
+	def render(self, template, values, bIncrementCounter):
+		if template.counter is not None:
+			key = self.getCounterKey(template.counter, values)
+			counts = self.nextCount(key,
+					lambda: self.getRandomTotal(template.total1), lambda: template.total2, bIncrementCounter)
+			return self.formatName(template, values, counts)
+		return self.formatName(template, values, None)
+
+	def formatName(self, template, values, counts):
+		"""
+		Fills the template in with values and the counter's (cnt, tt1, tt2).
+		"""
+		if counts is not None:
+			(values[CODE_CNT], values[CODE_TT1], values[CODE_TT2]) = counts
+			for (iCode, zsCntCode, zsNumberFormat) in template.counts:
+#               a negative count means the code is not in the convention that started the counter
+				if values[iCode] < 0:
+					values[iCode] = zsCntCode
+				else:
+					values[iCode] = self.FormatNumber(zsNumberFormat, values[iCode])
+
+		return template.format % tuple([values[iCode] for iCode in template.codes])
+
+	def substitute(self, zsName, values, pPlayer, pUnit, pCity, bIncrementCounter):
+		"""
+		Swaps the codes out of the convention one after the other; used for
+		^nav^ and conventions that could not be compiled.
+		"""
+		#if zsName == "":
+		#zsName = "^ut^ ^cnt[r]^ Div ^tt1[s][5:7]^ : ^ct^ ^tt2[o][101]^"
+
+		#BUGPrint("UnitNameEM-A [" + zsName + "]")
+
 #       replace the fixed items in the naming conv
-		zsName = zsName.replace("^ct^", zsCity)
-		zsName = zsName.replace("^cv^", zsCiv)
-		zsName = zsName.replace("^ut^", zsUnit)
-		zsName = zsName.replace("^cb^", zsUnitCombat)
-		zsName = zsName.replace("^dm^", zsUnitDomain)
-		zsName = zsName.replace("^ld^", zsLeader)
+		for (zsCode, iCode) in FIXED_CODES:
+			if values[iCode] is not None:
+				zsName = zsName.replace(zsCode, values[iCode])
 
 		#BUGPrint("UnitNameEM-D [" + zsName + "]")
 
 #       check if there are any more codes to swap out, return if not
-		counters = BugData.getGameData().getTable(SD_MOD_ID)
 		while ((zsName.find("^cnt") != -1) or (zsName.find("^nav") != -1)):
 #           determine what I am counting across
-			zsSDKey = self.getCounter(zsName)
-			if zsSDKey == "UNIT":       zsSDKey = zsSDKey + zsUnit
-			elif zsSDKey == "COMBAT":   zsSDKey = zsSDKey + zsUnitCombat
-			elif zsSDKey == "CITY":     zsSDKey = zsSDKey + zsCity
-			elif zsSDKey == "UNITCITY": zsSDKey = zsSDKey + zsUnit + zsCity
-			elif zsSDKey == "DOMAIN":   zsSDKey = zsSDKey + zsUnitDomain
-
-			#BUGPrint("UnitNameEM-E [" + zsSDKey + "]")
-
-#           see if we have already started this counter
-			if (not counters.hasTable(zsSDKey)):
-				#Since no record create entries
-				ziCnt = 0
-				ziTT1 = self.getTotal1(zsName)
-				ziTT2 = self.getTotal2(zsName)
-				counter = counters.getTable(zsSDKey)
-			else:
-#               get the count values
-				counter = counters.getTable(zsSDKey)
-				ziCnt = counter["cnt"]
-				ziTT1 = counter["tt1"]
-				ziTT2 = counter["tt2"]
-
-			#BUGPrint("UnitNameEM-F [" + str(ziCnt) + "] [" + str(ziTT1) + "] [" + str(ziTT2) + "]")
-
-#           increment count, adjust totals if required
-			if bIncrementCounter:
-				ziCnt = ziCnt + 1
-				if (ziCnt > ziTT1
-				and ziTT1 > 0):
-					ziCnt = 1
-					ziTT1 = self.getTotal1(zsName)
-					ziTT2 = ziTT2 + 1
-#               store the new values
-				counter["cnt"] = ziCnt
-				counter["tt1"] = ziTT1
-				counter["tt2"] = ziTT2
+			key = self.getCounterKey(self.getCounter(zsName), values)
+
+			(ziCnt, ziTT1, ziTT2) = self.nextCount(key,
+					lambda: self.getTotal1(zsName), lambda: self.getTotal2(zsName), bIncrementCounter)
 
 			if (zsName.find("^nav") != -1):
 				zsName = NavalUnitNaming.generateName(zsName, pPlayer.getCivilizationType(), pUnit, pCity, ziCnt)
@@ -461,6 +759,53 @@ class UnitReName(object):
 
 		return zsName
 
+	def getCounterKey(self, zsSDKey, values):
+		return (zsSDKey,) + tuple([values[iCode] for iCode in COUNTER_CODES.get(zsSDKey, ())])
+
+	def nextCount(self, key, getTotal1, getTotal2, bIncrementCounter):
+		"""
+		Returns the count and totals of the counter, incremented if
+		bIncrementCounter. getTotal1 and getTotal2 return the totals a new
+		counter starts with; getTotal1 is called again when the count wraps.
+		Only an incremented counter is stored.
+		"""
+#       see if we have already started this counter
+		counter = COUNTERS.get(key)
+		if counter is None:
+			ziCnt = 0
+			ziTT1 = getTotal1()
+			ziTT2 = getTotal2()
+		else:
+			(ziCnt, ziTT1, ziTT2) = counter
+
+#       increment count, adjust totals if required
+		if bIncrementCounter:
+			ziCnt = ziCnt + 1
+			if (ziCnt > ziTT1
+			and ziTT1 > 0):
+				ziCnt = 1
+				ziTT1 = getTotal1()
+				ziTT2 = ziTT2 + 1
+			COUNTERS.set(key, (ziCnt, ziTT1, ziTT2))
+
+		return (ziCnt, ziTT1, ziTT2)
+
+	def getUnitNameConv(self, pPlayer, pUnit):
+		"""
+		The naming convention for the unit, looked up in the options the
+		first time its era, unit class and combat type come up.
+		"""
+		key = (pPlayer.getCurrentEra(), pUnit.getUnitClassType(), pUnit.getUnitCombatType())
+		try:
+			return CONVENTIONS[key]
+		except KeyError:
+			zsEra = gc.getEraInfo(key[0]).getType()
+			zsUnitClass = getUnitClassType(key[1])
+			zsUnitCombat = self.getUnitCombat(pUnit)
+			zsUnitNameConv = self.getUnitNameConvFromIniFile(zsEra, zsUnitClass, zsUnitCombat)
+			CONVENTIONS[key] = zsUnitNameConv
+			return zsUnitNameConv
+
 	def getUnitNameConvFromIniFile(self, Era, UnitClass, UnitCombat):
 ##    a. try to get the advanced naming convention
 ##    b. if it returns 'DEFAULT', then get the combat based naming convention
@@ -549,11 +894,14 @@ class UnitReName(object):
 
 	def getTotal1(self, conv):
 ##  - ^tt1[f][x:y]^ - total where the total is a random number between x and y (number)
+		return self.getRandomTotal(self.parseTotal1(conv))
+
 
+	def parseTotal1(self, conv):
 #       return 'not found' indicator
 		ziStart = conv.find("^tt1[")
 		if (ziStart == -1):
-			return -1
+			return None
 
 #       locate and extract the 'low' value
 		ziStart = conv.find("[",ziStart)
@@ -568,7 +916,16 @@ class UnitReName(object):
 		ziHigh = int(conv[ziStart + 1:ziEnd])
 		if (ziHigh < 1): ziHigh = 1
 
+		return (ziLow, ziHigh)
+
+
+	def getRandomTotal(self, total):
+#       return 'not found' indicator
+		if total is None:
+			return -1
+
 #       check that the user isn't an idiot
+		(ziLow, ziHigh) = total
 		if (ziLow > ziHigh): return ziLow
 
 #       return the value